@@ -37,9 +37,15 @@ class Settings:
        # Scraper Settings
        self.SCRAPER_SETTINGS = {
            'timeout': 30,
+           'connect_timeout': 10,
+           'read_timeout': 30,
            'user_agent': 'SEOAnalysisTool/1.0',
            'max_retries': 3,
-           'retry_delay': 5
+           'retry_delay': 5,
+           'max_retry_delay': 60,
+           'retry_statuses': [429, 500, 502, 503, 504],
+           'circuit_failure_threshold': 5,
+           'circuit_reset_timeout': 60
        }
        
        # Report Export Settings
@@ -1,4 +1,16 @@
 from .web_scraper import SEOScraper
 from .validators import URLValidator
+from .cache import ValidatorStore, AnalysisMemo
+from .link_checker import LinkChecker
+from .redirects import RedirectResolver
+from .image_audit import ImageAuditor
+from .resource_audit import ResourceAuditor
+from .crawler import SiteCrawler
+from .sitemap import SitemapReader
+from .politeness import PolitenessScheduler
+from .archive import ResponseArchive
 
-__all__ = ['SEOScraper', 'URLValidator']
\ No newline at end of file
+__all__ = [
+    'SEOScraper', 'URLValidator', 'ValidatorStore', 'AnalysisMemo', 'LinkChecker', 'RedirectResolver',
+    'ImageAuditor', 'ResourceAuditor', 'SiteCrawler', 'SitemapReader', 'PolitenessScheduler', 'ResponseArchive'
+]
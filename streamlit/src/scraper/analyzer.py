@@ -0,0 +1,403 @@
+from functools import lru_cache
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from bs4.element import Tag, NavigableString, CData
+import lxml.html
+from lxml import etree
+from typing import Dict, Any, List, Optional, Union
+from .content import ContentAnalytics, INLINE_TAGS
+from .urls import resolve_url, site_host
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+FAVICON_RELS = ('icon', 'shortcut icon')
+
+# BeautifulSoup tree builders plus 'lxml-tree', which walks the lxml tree directly
+PARSER_BACKENDS = ('html.parser', 'lxml', 'lxml-tree')
+
+# Elements whose text is not visible on the rendered page
+HIDDEN_TAGS = frozenset(('head', 'title', 'script', 'style', 'template', 'noscript'))
+
+# <link rel> values that fetch a subresource ahead of its use
+PRELOAD_RELS = ('preload', 'modulepreload')
+
+# Media that never match on screen, so the stylesheet does not block rendering
+NON_BLOCKING_MEDIA = ('print', 'speech', 'not all')
+
+# <script type> values of classic JavaScript; other types (JSON, templates) are not fetched
+SCRIPT_TYPES = ('text/javascript', 'application/javascript', 'text/ecmascript', 'application/ecmascript')
+
+
+class PageAnalyzer:
+    """
+    Single-pass SEO analyzer.
+
+    Elements and text nodes are fed in document order through handle_element(),
+    handle_text() and handle_end(); every section of the analysis is accumulated
+    during that one walk instead of re-searching the tree per check.
+    """
+
+    def __init__(self):
+        self.title: Optional[str] = None
+        self.seen_title = False
+        self.meta: Dict[str, Optional[str]] = {}
+        self.charset: Optional[str] = None
+        self.headings = {tag: 0 for tag in HEADING_TAGS}
+        self.total_images = 0
+        self.missing_alt = 0
+        self.missing_src = 0
+        self.image_srcs: List[str] = []
+        self.total_links = 0
+        self.hrefs: List[str] = []
+        self.anchor_texts: List[str] = []
+        self._anchor_parts: Optional[List[str]] = None
+        self.base_href: Optional[str] = None
+        self.content = ContentAnalytics()
+        self.paragraphs = 0
+        self.has_structured_data = False
+        self.has_canonical = False
+        self.canonical_href: Optional[str] = None
+        self.hreflang: List[Dict[str, str]] = []
+        self.has_favicon = False
+        self.stylesheets: List[Dict[str, Any]] = []
+        self.scripts: List[Dict[str, Any]] = []
+        self.preloads: List[Dict[str, Any]] = []
+        self._head_depth = 0
+        self._open_hidden: List[bool] = []
+        self._hidden_depth = 0
+
+    def handle_element(self, name: str, attrs: Dict[str, Any]):
+        """Record one element; every call must be matched by handle_end()"""
+        hidden = name in HIDDEN_TAGS or 'hidden' in attrs
+        self._open_hidden.append(hidden)
+        if hidden:
+            self._hidden_depth += 1
+        if name == 'head':
+            self._head_depth += 1
+        if name not in INLINE_TAGS:
+            self.content.break_text()
+
+        if name in self.headings:
+            self.headings[name] += 1
+        elif name == 'a':
+            self._handle_link(attrs)
+        elif name == 'p':
+            self.paragraphs += 1
+        elif name == 'img':
+            self.total_images += 1
+            if not attrs.get('alt'):
+                self.missing_alt += 1
+            if self._anchor_parts is not None and attrs.get('alt'):
+                self._anchor_parts.append(attrs.get('alt'))
+            if not attrs.get('src'):
+                self.missing_src += 1
+            else:
+                self.image_srcs.append(attrs.get('src'))
+        elif name == 'meta':
+            self._handle_meta(attrs)
+        elif name == 'link':
+            self._handle_link_tag(attrs)
+        elif name == 'script':
+            if attrs.get('type') == 'application/ld+json':
+                self.has_structured_data = True
+            elif attrs.get('src'):
+                self._handle_script(attrs)
+        elif name == 'base':
+            if self.base_href is None and attrs.get('href'):
+                self.base_href = attrs.get('href')
+
+    def handle_title(self, text: Optional[str]):
+        """Record the string of a <title>; only the first one counts"""
+        if not self.seen_title:
+            self.seen_title = True
+            self.title = str(text) if text is not None else None
+
+    def handle_end(self, name: str):
+        """Close the element last opened with handle_element()"""
+        if self._open_hidden.pop():
+            self._hidden_depth -= 1
+        if name == 'head':
+            self._head_depth -= 1
+        elif name == 'a':
+            self._close_anchor()
+        if name not in INLINE_TAGS:
+            self.content.break_text()
+
+    def handle_text(self, text: str):
+        """Feed a text node to the content analytics (and the open link's anchor text) unless it is hidden"""
+        if not self._hidden_depth:
+            self.content.add_text(text)
+            if self._anchor_parts is not None:
+                self._anchor_parts.append(text)
+
+    def _handle_meta(self, attrs: Dict[str, Any]):
+        name = attrs.get('name')
+        if name in ('description', 'keywords', 'viewport') and name not in self.meta:
+            self.meta[name] = attrs.get('content', None)
+        if self.charset is None and 'charset' in attrs:
+            self.charset = attrs.get('charset', None)
+
+    def _handle_link_tag(self, attrs: Dict[str, Any]):
+        rel = _rel_values(attrs.get('rel'))
+        if 'canonical' in rel:
+            self.has_canonical = True
+            if self.canonical_href is None and attrs.get('href'):
+                self.canonical_href = attrs.get('href')
+        if 'alternate' in rel and attrs.get('hreflang') and attrs.get('href'):
+            self.hreflang.append({'hreflang': attrs.get('hreflang').strip().lower(), 'href': attrs.get('href')})
+        if any(value in FAVICON_RELS for value in rel) or ' '.join(rel) in FAVICON_RELS:
+            self.has_favicon = True
+        href = attrs.get('href')
+        if not href:
+            return
+        if 'stylesheet' in rel and 'alternate' not in rel:
+            media = (attrs.get('media') or '').strip().lower()
+            self.stylesheets.append({
+                'src': href,
+                'render_blocking': bool(self._head_depth) and 'disabled' not in attrs
+                                   and media not in NON_BLOCKING_MEDIA
+            })
+        elif any(value in PRELOAD_RELS for value in rel):
+            resource_type = 'script' if 'modulepreload' in rel else (attrs.get('as') or '').lower() or None
+            self.preloads.append({'src': href, 'as': resource_type})
+
+    def _handle_script(self, attrs: Dict[str, Any]):
+        """External scripts; classic scripts in <head> without async/defer block rendering"""
+        script_type = (attrs.get('type') or '').strip().lower()
+        if script_type and script_type not in SCRIPT_TYPES and script_type != 'module':
+            return
+        self.scripts.append({
+            'src': attrs.get('src'),
+            'render_blocking': bool(self._head_depth) and script_type != 'module'
+                               and 'async' not in attrs and 'defer' not in attrs
+        })
+
+    def _handle_link(self, attrs: Dict[str, Any]):
+        # Links do not nest: like browsers, a new <a> ends the one still open
+        self._close_anchor()
+        self.total_links += 1
+        href = attrs.get('href')
+        if href:
+            self.hrefs.append(href)
+            self.anchor_texts.append('')
+            self._anchor_parts = []
+
+    def _close_anchor(self):
+        """Store the open link's collected anchor text, if a link is open"""
+        if self._anchor_parts is not None:
+            self.anchor_texts[-1] = ' '.join(' '.join(self._anchor_parts).split())
+            self._anchor_parts = None
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Build the analysis dict.
+        Links and image sources are left as raw attribute values; resolve_urls()
+        turns them into absolute URLs once the page URL is known, so the parse
+        result itself does not depend on the URL.
+        """
+        return {
+            'meta_tags': {
+                'title': self.title,
+                'meta_description': self.meta.get('description'),
+                'meta_keywords': self.meta.get('keywords'),
+                'viewport': self.meta.get('viewport'),
+                'charset': self.charset
+            },
+            'headings': dict(self.headings),
+            'images': {
+                'total_images': self.total_images,
+                'missing_alt': self.missing_alt,
+                'missing_src': self.missing_src,
+                'srcs': list(self.image_srcs)
+            },
+            'links': {
+                'total_links': self.total_links,
+                'hrefs': list(self.hrefs),
+                'anchor_texts': list(self.anchor_texts),
+                'base_href': self.base_href
+            },
+            'content': {
+                **self.content.result(),
+                'paragraphs': self.paragraphs,
+                'has_structured_data': self.has_structured_data
+            },
+            'resources': {
+                'stylesheets': [dict(resource) for resource in self.stylesheets],
+                'scripts': [dict(resource) for resource in self.scripts],
+                'preloads': [dict(resource) for resource in self.preloads]
+            },
+            'technical': {
+                'has_canonical': self.has_canonical,
+                'canonical_href': self.canonical_href,
+                'hreflang': [dict(alternate) for alternate in self.hreflang],
+                'has_favicon': self.has_favicon,
+                'has_viewport': 'viewport' in self.meta
+            }
+        }
+
+
+def analyze_document(html: Union[str, bytes], encoding: Optional[str] = None,
+                     backend: str = 'html.parser') -> Dict[str, Any]:
+    """
+    Parse and analyze a raw document with the given parser backend.
+    Module-level and free of shared state so it can run in a worker process.
+    The result still holds raw links; see resolve_urls().
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    if isinstance(html, bytes) and encoding and backend != 'html.parser' and not _libxml2_supports(encoding):
+        # libxml2 lacks some codecs Python has (cp437, utf-32, ...); decode those here
+        html, encoding = html.decode(encoding, errors='replace'), None
+
+    if backend == 'lxml-tree':
+        root = parse_tree(html, encoding)
+        analysis = analyze_tree(root) if root is not None else PageAnalyzer().result()
+    elif isinstance(html, bytes):
+        analysis = analyze_soup(BeautifulSoup(html, backend, from_encoding=encoding))
+    else:
+        analysis = analyze_soup(BeautifulSoup(html, backend))
+    analysis['resources']['document_bytes'] = len(html) if isinstance(html, bytes) else len(html.encode('utf-8'))
+    return analysis
+
+
+def resolve_urls(analysis: Dict[str, Any], url: str) -> Dict[str, Any]:
+    """
+    Resolve the raw hrefs, image sources, subresources, canonical and hreflang
+    targets of an analysis against the page URL (or its <base href>) and
+    classify links as internal or external by host; internal links keep their
+    anchor text under internal_anchors. Non-web links such as mailto: and javascript: are counted in total_links only.
+    """
+    links = analysis.get('links', {})
+    if 'hrefs' not in links:
+        return analysis
+
+    base_url = urljoin(url, links['base_href']) if links.get('base_href') else url
+    images = analysis['images']
+    image_urls = (resolve_url(base_url, src) for src in images.pop('srcs'))
+    images['image_urls'] = list(dict.fromkeys(image_url for image_url in image_urls if image_url))
+
+    resources = analysis.get('resources', {})
+    for kind in ('stylesheets', 'scripts', 'preloads'):
+        resolved = []
+        for resource in resources.get(kind, []):
+            resource_url = resolve_url(base_url, resource.pop('src'))
+            if resource_url:
+                resolved.append({'url': resource_url, **resource})
+        resources[kind] = resolved
+
+    technical = analysis.get('technical', {})
+    if 'canonical_href' in technical:
+        canonical_href = technical.pop('canonical_href')
+        technical['canonical_url'] = resolve_url(base_url, canonical_href) if canonical_href else None
+        alternates = ((alternate['hreflang'], resolve_url(base_url, alternate['href']))
+                      for alternate in technical['hreflang'])
+        technical['hreflang'] = [
+            {'hreflang': hreflang, 'url': alternate_url} for hreflang, alternate_url in alternates if alternate_url
+        ]
+
+    site = site_host(url)
+    internal_urls: List[str] = []
+    external_urls: List[str] = []
+    anchors: List[Dict[str, str]] = []
+    for href, text in zip(links['hrefs'], links.get('anchor_texts') or [''] * len(links['hrefs'])):
+        target = resolve_url(base_url, href)
+        if target is None:
+            continue
+        if site_host(target) == site:
+            internal_urls.append(target)
+            anchors.append({'url': target, 'text': text})
+        else:
+            external_urls.append(target)
+
+    analysis['links'] = {
+        'internal_links': len(internal_urls),
+        'external_links': len(external_urls),
+        'total_links': links['total_links'],
+        'internal_urls': list(dict.fromkeys(internal_urls)),
+        'external_urls': list(dict.fromkeys(external_urls)),
+        'internal_anchors': anchors
+    }
+    return analysis
+
+
+def parse_tree(html: Union[str, bytes], encoding: Optional[str] = None) -> Optional[etree._Element]:
+    """Parse a document into a raw lxml tree; None for an empty document"""
+    try:
+        if isinstance(html, bytes):
+            return lxml.html.document_fromstring(html, parser=lxml.html.HTMLParser(encoding=encoding))
+        return lxml.html.document_fromstring(html)
+    except etree.ParserError:
+        return None
+
+
+def analyze_soup(soup: BeautifulSoup) -> Dict[str, Any]:
+    """Analyze a parsed document by visiting every node exactly once"""
+    analyzer = PageAnalyzer()
+    # Elements are closed once the walk reaches a node outside them
+    open_tags: List[Tag] = [soup]
+    for node in soup.descendants:
+        parent = node.parent
+        while open_tags[-1] is not parent:
+            analyzer.handle_end(open_tags.pop().name)
+        if isinstance(node, Tag):
+            analyzer.handle_element(node.name, node.attrs)
+            if node.name == 'title':
+                analyzer.handle_title(node.string)
+            open_tags.append(node)
+        elif type(node) in (NavigableString, CData):
+            analyzer.handle_text(node)
+    while len(open_tags) > 1:
+        analyzer.handle_end(open_tags.pop().name)
+    return analyzer.result()
+
+
+def analyze_tree(root: etree._Element) -> Dict[str, Any]:
+    """
+    Analyze a raw lxml tree in one walk, without building a soup.
+    Text is visited in document order (element text, children, then tail) so
+    results match analyze_soup().
+    """
+    analyzer = PageAnalyzer()
+    stack = [(root, False)]
+    while stack:
+        element, closing = stack.pop()
+        tag = element.tag
+        is_element = isinstance(tag, str)
+
+        if closing:
+            if is_element:
+                analyzer.handle_end(tag)
+            if element.tail:
+                analyzer.handle_text(element.tail)
+            continue
+
+        stack.append((element, True))
+        if not is_element:
+            # Comments and processing instructions only contribute their tail
+            continue
+
+        analyzer.handle_element(tag, element.attrib)
+        if tag == 'title':
+            analyzer.handle_title(element.text if len(element) == 0 else None)
+        if element.text:
+            analyzer.handle_text(element.text)
+        stack.extend((child, False) for child in reversed(element))
+    return analyzer.result()
+
+
+@lru_cache(maxsize=None)
+def _libxml2_supports(encoding: str) -> bool:
+    """Whether lxml can decode a document in this encoding itself"""
+    try:
+        etree.HTMLParser(encoding=encoding)
+    except LookupError:
+        return False
+    return True
+
+
+def _rel_values(rel: Any) -> List[str]:
+    """Normalize a rel attribute to its list of values"""
+    if not rel:
+        return []
+    if isinstance(rel, str):
+        return rel.split()
+    return list(rel)
@@ -0,0 +1,274 @@
+import asyncio
+import glob
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Any, AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+from .encoding import sniff_encoding
+
+SEGMENT_PATTERN = 'segment-{:05d}.warc.gz'
+INDEX_FILE = 'index.bin'
+
+# Index entry: URL hash, fetch time, segment number, offset and compressed length of the record
+INDEX_ENTRY = struct.Struct('<16sdIQQ')
+
+DEFAULT_SEGMENT_BYTES = 256 * 1024 * 1024
+
+# The archived body is stored decoded, so these no longer describe it
+DROPPED_HEADERS = (b'content-encoding', b'transfer-encoding', b'content-length')
+
+
+class ResponseArchive:
+    """
+    Append-only archive of fetched responses for offline re-analysis.
+
+    Each response (status line, headers and body) is written as a WARC
+    'response' record, gzip-compressed as its own member, to the current
+    segment file; segments roll over at segment_max_bytes. A fixed-width
+    binary index (URL hash, fetch time, segment, offset, length) is appended
+    next to them and memory-mapped for lookups, so a record is read with one
+    seek and one decompression, and the archive is never loaded as a whole.
+    Writes may come from several threads: records are compressed in
+    parallel and appended one at a time.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = DEFAULT_SEGMENT_BYTES,
+                 compression_level: int = 6):
+        """
+        Initialize the archive, creating the directory if needed.
+        :param directory: Directory holding the segment files and the index.
+        :param segment_max_bytes: Size from which a new segment file is started.
+        :param compression_level: zlib compression level for the records.
+        """
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.compression_level = compression_level
+        os.makedirs(directory, exist_ok=True)
+
+        segments = sorted(glob.glob(os.path.join(directory, 'segment-*.warc.gz')))
+        self._segment = len(segments) - 1 if segments else 0
+        self._segment_file = None
+        self._index_path = os.path.join(directory, INDEX_FILE)
+        self._index_file = None
+        self._index_map: Optional[mmap.mmap] = None
+        self._write_lock = threading.Lock()
+
+    def write(self, url: str, status: int, headers: Iterable[Tuple[bytes, bytes]], body: bytes,
+              reason: str = '', fetched_at: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Append one response and index it.
+        :param headers: Raw header pairs, as in ClientResponse.raw_headers.
+        :param body: Decoded response body.
+        :param fetched_at: Fetch time as a Unix timestamp; defaults to now.
+        :return: Location of the record: segment, offset and length.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        http_block = self._http_block(status, reason, headers, body)
+        warc_date = datetime.fromtimestamp(fetched_at, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        warc_headers = (
+            'WARC/1.1\r\n'
+            'WARC-Type: response\r\n'
+            f'WARC-Target-URI: {url}\r\n'
+            f'WARC-Date: {warc_date}\r\n'
+            'Content-Type: application/http; msgtype=response\r\n'
+            f'Content-Length: {len(http_block)}\r\n'
+            '\r\n'
+        ).encode('utf-8')
+        record = _gzip_member(warc_headers + http_block + b'\r\n\r\n', self.compression_level)
+
+        with self._write_lock:
+            segment_file = self._get_segment_file(len(record))
+            offset = segment_file.tell()
+            segment_file.write(record)
+            segment_file.flush()
+
+            # The record is on disk before the index points at it
+            if self._index_file is None:
+                self._index_file = open(self._index_path, 'ab')
+            self._index_file.write(INDEX_ENTRY.pack(_url_key(url), fetched_at, self._segment, offset, len(record)))
+            self._index_file.flush()
+            return {'segment': self._segment, 'offset': offset, 'length': len(record)}
+
+    def lookup(self, url: str, at: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest archived response for a URL, or the latest one fetched
+        at or before the `at` timestamp.
+        """
+        key = _url_key(url)
+        best = None
+        for fetched_at, segment, offset, length in self._find(key):
+            if (at is None or fetched_at <= at) and (best is None or fetched_at >= best[0]):
+                best = (fetched_at, segment, offset, length)
+        if best is None:
+            return None
+        record = self.read(*best[1:])
+        return record if record['url'] == url else None
+
+    def read(self, segment: int, offset: int, length: int) -> Dict[str, Any]:
+        """Read and decode the record at a location"""
+        with open(os.path.join(self.directory, SEGMENT_PATTERN.format(segment)), 'rb') as f:
+            f.seek(offset)
+            data = zlib.decompress(f.read(length), 16 + zlib.MAX_WBITS)
+        return _parse_record(data)
+
+    def iter_index(self) -> Iterator[Tuple[bytes, float, int, int, int]]:
+        """Iterate over all index entries in write order"""
+        index = self._get_index_map()
+        if index is not None:
+            yield from INDEX_ENTRY.iter_unpack(memoryview(index)[:len(index) - len(index) % INDEX_ENTRY.size])
+
+    def iter_records(self, latest_only: bool = True,
+                     urls: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over archived responses in segment order.
+        :param latest_only: Only the most recent response per URL.
+        :param urls: Restrict to these URLs.
+        """
+        keys = {_url_key(url) for url in urls} if urls is not None else None
+        if latest_only:
+            latest: Dict[bytes, Tuple[float, int, int, int]] = {}
+            for key, fetched_at, segment, offset, length in self.iter_index():
+                if keys is not None and key not in keys:
+                    continue
+                if key not in latest or fetched_at >= latest[key][0]:
+                    latest[key] = (fetched_at, segment, offset, length)
+            locations = sorted(location[1:] for location in latest.values())
+        else:
+            locations = [
+                (segment, offset, length)
+                for key, _, segment, offset, length in self.iter_index()
+                if keys is None or key in keys
+            ]
+
+        for location in locations:
+            yield self.read(*location)
+
+    async def replay(self, scraper, latest_only: bool = True, urls: Optional[Iterable[str]] = None,
+                     batch_size: int = 32) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Re-analyze archived responses with scraper.analyze_content(), without
+        any network traffic. Yields each analysis with 'url' and 'fetched_at'
+        added; non-2xx responses are yielded as errors, like a live scrape.
+        Batches are analyzed concurrently, so a parse executor is used in parallel.
+        """
+        batch: List[Dict[str, Any]] = []
+        for record in self.iter_records(latest_only, urls):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                for result in await self._analyze_batch(scraper, batch):
+                    yield result
+                batch = []
+        if batch:
+            for result in await self._analyze_batch(scraper, batch):
+                yield result
+
+    async def _analyze_batch(self, scraper, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        async def analyze(record):
+            page = {'url': record['url'], 'fetched_at': record['fetched_at']}
+            if not 200 <= record['status'] < 300:
+                return {**page, 'error': f"HTTP {record['status']}"}
+            encoding, body = sniff_encoding(record['body'], record['headers'].get('content-type', ''))
+            return {**page, **await scraper.analyze_content(body, record['url'], encoding)}
+
+        return list(await asyncio.gather(*(analyze(record) for record in records)))
+
+    def close(self):
+        """Close open files; the archive reopens them when used again"""
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+    def _get_segment_file(self, record_size: int):
+        """Open the current segment for appending, rolling over when it is full"""
+        if self._segment_file is None:
+            self._segment_file = open(os.path.join(self.directory, SEGMENT_PATTERN.format(self._segment)), 'ab')
+        size = self._segment_file.tell()
+        if size and size + record_size > self.segment_max_bytes:
+            self._segment_file.close()
+            self._segment += 1
+            self._segment_file = open(os.path.join(self.directory, SEGMENT_PATTERN.format(self._segment)), 'ab')
+        return self._segment_file
+
+    def _get_index_map(self) -> Optional[mmap.mmap]:
+        """Map the index read-only, remapping when entries were appended since; None while it is empty"""
+        if not os.path.exists(self._index_path):
+            return None
+        size = os.path.getsize(self._index_path)
+        if size == 0:
+            return None
+        if self._index_map is None or len(self._index_map) != size:
+            if self._index_map is not None:
+                self._index_map.close()
+            with open(self._index_path, 'rb') as f:
+                self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._index_map
+
+    def _find(self, key: bytes) -> Iterator[Tuple[float, int, int, int]]:
+        """Scan the mapped index for entries with a URL hash, at C speed via find()"""
+        index = self._get_index_map()
+        if index is None:
+            return
+        position = index.find(key)
+        while position != -1:
+            if position % INDEX_ENTRY.size == 0:
+                yield INDEX_ENTRY.unpack_from(index, position)[1:]
+                position = index.find(key, position + INDEX_ENTRY.size)
+            else:
+                position = index.find(key, position + 1)
+
+    def _http_block(self, status: int, reason: str, headers: Iterable[Tuple[bytes, bytes]], body: bytes) -> bytes:
+        """Serialize status line, headers and body as an HTTP response message"""
+        lines = [f'HTTP/1.1 {status} {reason}'.rstrip().encode('latin-1')]
+        for name, value in headers:
+            if name.lower() not in DROPPED_HEADERS:
+                lines.append(name + b': ' + value)
+        lines.append(b'Content-Length: ' + str(len(body)).encode('ascii'))
+        return b'\r\n'.join(lines) + b'\r\n\r\n' + body
+
+
+def _url_key(url: str) -> bytes:
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+
+
+def _gzip_member(data: bytes, level: int) -> bytes:
+    """Compress data as one self-contained gzip member"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _parse_record(data: bytes) -> Dict[str, Any]:
+    """Split a WARC response record into URL, fetch time, status, headers and body"""
+    warc_head, _, block = data.partition(b'\r\n\r\n')
+    warc_headers = _parse_headers(warc_head.split(b'\r\n')[1:], 'utf-8')
+    block = block[:int(warc_headers['content-length'])]
+
+    http_head, _, body = block.partition(b'\r\n\r\n')
+    status_line, *header_lines = http_head.split(b'\r\n')
+    fetched_at = datetime.strptime(warc_headers['warc-date'], '%Y-%m-%dT%H:%M:%S.%fZ')
+    return {
+        'url': warc_headers['warc-target-uri'],
+        'fetched_at': fetched_at.replace(tzinfo=timezone.utc).timestamp(),
+        'status': int(status_line.split()[1]),
+        'headers': _parse_headers(header_lines),
+        'body': body
+    }
+
+
+def _parse_headers(lines: List[bytes], encoding: str = 'latin-1') -> Dict[str, str]:
+    """Parse header lines into a dict with lowercase names; the first value wins"""
+    headers: Dict[str, str] = {}
+    for line in lines:
+        name, _, value = line.partition(b':')
+        headers.setdefault(name.strip().lower().decode(encoding), value.strip().decode(encoding))
+    return headers
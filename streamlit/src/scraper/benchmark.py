@@ -0,0 +1,313 @@
+"""
+Scraper analysis benchmark.
+
+Run from the streamlit/ directory:
+    python -m src.scraper.benchmark --sections 2000 --repeat 5
+    python -m src.scraper.benchmark --network --pages 500 --latency 0.02
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
+from typing import Dict, Any, Callable, List
+from .analyzer import analyze_soup, analyze_document, resolve_urls, PARSER_BACKENDS
+from .content import ContentAnalytics
+from .crawler import SiteCrawler
+from .fixture_server import FixtureServer
+from .urls import resolve_url
+from .web_scraper import SEOScraper
+
+BENCHMARK_URL = 'https://example.com/'
+
+# Documents exercising the edge cases where parser trees tend to differ
+PARITY_SAMPLES = [
+    '<title>Bare fragment</title><p>a<b>b</b> c</p><link rel="icon"><meta name="viewport">'
+    '<meta charset="latin-1"><a href="">empty</a>',
+    '<!DOCTYPE html><html><head><meta charset="utf-8"><title>A &amp; B</title><style>p{}</style>'
+    '<script>var a = 1;</script></head><body><!-- comment -->tail<p>y<br>z</p>'
+    '<template><p>hidden</p></template><noscript>no script</noscript><img alt="" src="a.png">'
+    '<a href="//example.com/x">protocol relative</a></body></html>',
+    '<html><head><link rel="shortcut icon" href="/f"><link rel="canonical" href="/c">'
+    '<script type="application/ld+json">{}</script></head><body><h1>One</h1><h2>Two</h2>'
+    '<div>foo<span>bar</span> baz</div><img src=""><a>no href</a></body></html>',
+    '<p><a href="/x">x<a href="/y">y</a></a><a href="/z">z<b>bold<a href="/w">w</a></b></a></p>',
+]
+
+
+def build_page(sections: int = 500) -> str:
+    """Build a synthetic page whose size grows linearly with sections"""
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8">',
+        '<title>Benchmark page</title>',
+        '<meta name="description" content="Synthetic page for scraper benchmarks">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        '<link rel="canonical" href="https://example.com/">',
+        '<link rel="shortcut icon" href="/favicon.ico">',
+        '<script type="application/ld+json">{"@type": "WebPage"}</script>',
+        '</head><body>'
+    ]
+    for i in range(sections):
+        alt = ' alt="Image"' if i % 3 else ''
+        parts.append(
+            f'<section><h{i % 6 + 1}>Section {i}</h{i % 6 + 1}>'
+            f'<p>Paragraph {i} with <b>some</b> text about search engine optimisation '
+            f'and <a href="/page-{i}">an internal link</a> plus '
+            f'<a href="https://other-{i % 50}.example.org/">an external one</a>.</p>'
+            f'<img src="/img/{i}.png"{alt}>'
+            f'<ul><li>Item one</li><li>Item two</li></ul></section>'
+        )
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def legacy_analyze(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+    """
+    Multi-pass analysis as SEOScraper did it before the single-pass analyzer (baseline).
+    Links are still classified by substring here, so only their totals are comparable.
+    """
+    meta = {
+        name: soup.find('meta', {'name': name}).get('content', None) if soup.find('meta', {'name': name}) else None
+        for name in ('description', 'keywords', 'viewport')
+    }
+    images = soup.find_all('img')
+    links = soup.find_all('a')
+    netloc = urlparse(url).netloc
+    internal = external = 0
+    for link in links:
+        href = link.get('href')
+        if href:
+            if href.startswith('/') or netloc in href:
+                internal += 1
+            else:
+                external += 1
+
+    return {
+        'meta_tags': {
+            'title': soup.title.string if soup.title else None,
+            'meta_description': meta['description'],
+            'meta_keywords': meta['keywords'],
+            'viewport': meta['viewport'],
+            'charset': soup.find('meta', {'charset': True}).get('charset', None) if soup.find('meta', {'charset': True}) else None
+        },
+        'headings': {f'h{i}': len(soup.find_all(f'h{i}')) for i in range(1, 7)},
+        'images': {
+            'total_images': len(images),
+            'missing_alt': len([img for img in images if not img.get('alt')]),
+            'missing_src': len([img for img in images if not img.get('src')]),
+        },
+        'links': {
+            'internal_links': internal,
+            'external_links': external,
+            'total_links': len(links)
+        },
+        'content': {
+            'word_count': len(soup.get_text().split()),
+            'paragraphs': len(soup.find_all('p')),
+            'has_structured_data': bool(soup.find_all('script', {'type': 'application/ld+json'}))
+        },
+        'technical': {
+            'has_canonical': bool(soup.find('link', {'rel': 'canonical'})),
+            'has_favicon': bool(soup.find('link', {'rel': ['icon', 'shortcut icon']})),
+            'has_viewport': bool(soup.find('meta', {'name': 'viewport'}))
+        }
+    }
+
+
+def multi_pass_analyze(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+    """
+    The baseline plus the link resolution and text statistics the single pass
+    also produces, each as its own pass, so both do the same work.
+    """
+    result = legacy_analyze(soup, url)
+    result['links']['urls'] = [resolve_url(url, link['href']) for link in soup.find_all('a', href=True)]
+    result['images']['image_urls'] = [resolve_url(url, image['src']) for image in soup.find_all('img', src=True)]
+    content = ContentAnalytics()
+    for block in soup.get_text('\n').split('\n'):
+        content.add_text(block)
+        content.break_text()
+    result['content'].update(content.result())
+    return result
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> float:
+    """Best wall-clock time of repeat calls, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def single_pass_analyze(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+    """Single-pass analysis including link resolution, as analyze_content runs it"""
+    return resolve_urls(analyze_soup(soup), url)
+
+
+def run_analysis_benchmark(sections: int = 2000, repeat: int = 5) -> Dict[str, Any]:
+    """
+    Compare multi-pass and single-pass analysis on one parsed page. The
+    speedup is over multi_pass_analyze(), which produces the same sections;
+    legacy_ms times the old scraper's smaller output for reference.
+    """
+    html = build_page(sections)
+    soup = BeautifulSoup(html, 'html.parser')
+
+    legacy_result = legacy_analyze(soup, BENCHMARK_URL)
+    single_result = single_pass_analyze(soup, BENCHMARK_URL)
+    for section, values in legacy_result.items():
+        if section == 'links':
+            values, result = values['total_links'], single_result[section]['total_links']
+        elif section in ('images', 'technical'):
+            result = {key: single_result[section][key] for key in values}
+        elif section == 'content':
+            # get_text() also counts the title and glues block elements together;
+            # the single pass counts visible words only
+            values = {key: value for key, value in values.items() if key != 'word_count'}
+            result = {key: single_result[section][key] for key in values}
+        else:
+            result = single_result[section]
+        if result != values:
+            raise AssertionError(f"Single-pass {section} differs from the multi-pass baseline")
+
+    legacy = time_call(lambda: legacy_analyze(soup, BENCHMARK_URL), repeat)
+    multi = time_call(lambda: multi_pass_analyze(soup, BENCHMARK_URL), repeat)
+    single = time_call(lambda: single_pass_analyze(soup, BENCHMARK_URL), repeat)
+    return {
+        'page_bytes': len(html.encode('utf-8')),
+        'legacy_ms': legacy * 1000,
+        'multi_pass_ms': multi * 1000,
+        'single_pass_ms': single * 1000,
+        'speedup': multi / single if single else 0.0
+    }
+
+
+def check_backend_parity(documents: List[str] = None) -> List[str]:
+    """
+    Analyze each document with every parser backend.
+    Returns a description of every mismatch; an empty list means full parity.
+    """
+    if documents is None:
+        documents = PARITY_SAMPLES + [build_page(100)]
+
+    mismatches = []
+    for index, html in enumerate(documents):
+        body = html.encode('utf-8')
+        expected = analyze_document(body, 'utf-8', PARSER_BACKENDS[0])
+        for backend in PARSER_BACKENDS[1:]:
+            result = analyze_document(body, 'utf-8', backend)
+            for section, values in expected.items():
+                if result.get(section) != values:
+                    mismatches.append(f"document {index}, {backend}, {section}: {result.get(section)} != {values}")
+    return mismatches
+
+
+def run_backend_benchmark(sections: int = 500, repeat: int = 5) -> Dict[str, float]:
+    """Parse-and-analyze throughput per backend, in pages per second"""
+    body = build_page(sections).encode('utf-8')
+    return {
+        backend: 1.0 / time_call(lambda: analyze_document(body, 'utf-8', backend), repeat)
+        for backend in PARSER_BACKENDS
+    }
+
+
+def percentile(values: List[float], share: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+async def run_fetch_benchmark(server: FixtureServer, concurrency: int = 20) -> Dict[str, float]:
+    """Scrape every fixture page once and report throughput and per-page latency"""
+    latencies: List[float] = []
+    errors = 0
+    limit = asyncio.Semaphore(concurrency)
+
+    async def fetch(scraper: SEOScraper, url: str):
+        nonlocal errors
+        async with limit:
+            started = time.perf_counter()
+            result = await scraper.scrape_page(url)
+            latencies.append(time.perf_counter() - started)
+            errors += 'error' in result
+
+    started = time.perf_counter()
+    async with SEOScraper(scraper_settings={'max_retries': 0}) as scraper:
+        await asyncio.gather(*(fetch(scraper, url) for url in server.page_urls()))
+    elapsed = time.perf_counter() - started
+    return {
+        'pages': len(latencies),
+        'errors': errors,
+        'pages_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000
+    }
+
+
+async def run_crawl_benchmark(server: FixtureServer, concurrency: int = 20) -> Dict[str, float]:
+    """Crawl the fixture site from its root and report throughput"""
+    crawler = SiteCrawler(
+        SEOScraper(scraper_settings={'max_retries': 0}),
+        max_pages=server.pages, max_depth=server.pages,
+        concurrency=concurrency, per_host_limit=concurrency
+    )
+    started = time.perf_counter()
+    async for _ in crawler.crawl(server.base_url + '/'):
+        pass
+    elapsed = time.perf_counter() - started
+    return {**crawler.stats, 'pages_per_second': crawler.stats['pages_crawled'] / elapsed}
+
+
+async def run_network_benchmarks(args: argparse.Namespace):
+    """Run the fetch and crawl benchmarks against an in-process fixture server"""
+    server = FixtureServer(
+        pages=args.pages, sections=args.page_sections, latency=args.latency,
+        latency_jitter=args.jitter, slow_rate=args.slow_rate, error_rate=args.error_rate
+    )
+    async with server:
+        fetch = await run_fetch_benchmark(server, args.concurrency)
+        crawl = await run_crawl_benchmark(server, args.concurrency)
+
+    print(f"Fetch:  {fetch['pages']} pages, {fetch['errors']} errors, {fetch['pages_per_second']:.1f} pages/s")
+    print(f"        p50 {fetch['p50_ms']:.1f} ms, p95 {fetch['p95_ms']:.1f} ms, p99 {fetch['p99_ms']:.1f} ms")
+    print(f"Crawl:  {crawl['pages_crawled']} pages, {crawl['errors']} errors, {crawl['pages_per_second']:.1f} pages/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SEO page analysis')
+    parser.add_argument('--sections', type=int, default=2000, help='Synthetic page size in sections')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement')
+    parser.add_argument('--network', action='store_true', help='Benchmark fetching and crawling a local fixture site')
+    parser.add_argument('--pages', type=int, default=500, help='Fixture site size in pages')
+    parser.add_argument('--page-sections', type=int, default=20, help='Content sections per fixture page')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent fetches')
+    parser.add_argument('--latency', type=float, default=0.0, help='Fixture response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra fixture delay in seconds')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='Share of slow fixture responses')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of failing fixture responses')
+    args = parser.parse_args()
+
+    if args.network:
+        asyncio.run(run_network_benchmarks(args))
+        return
+
+    result = run_analysis_benchmark(args.sections, args.repeat)
+    print(f"Page size:    {result['page_bytes'] / 1024:.0f} KB")
+    print(f"Legacy:       {result['legacy_ms']:.1f} ms (fewer sections)")
+    print(f"Multi-pass:   {result['multi_pass_ms']:.1f} ms")
+    print(f"Single-pass:  {result['single_pass_ms']:.1f} ms")
+    print(f"Speedup:      {result['speedup']:.1f}x")
+
+    mismatches = check_backend_parity()
+    if mismatches:
+        raise AssertionError('Parser backends disagree:\n' + '\n'.join(mismatches))
+
+    print('Parser backends (parse + analyze):')
+    for backend, pages_per_second in run_backend_benchmark(args.sections, args.repeat).items():
+        print(f"  {backend:<12} {pages_per_second:8.1f} pages/s")
+
+
+if __name__ == '__main__':
+    main()
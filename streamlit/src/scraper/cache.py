@@ -0,0 +1,130 @@
+import copy
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Union
+
+
+class ValidatorStore:
+    """
+    Per-URL store of HTTP cache validators (ETag / Last-Modified) together with
+    the analysis produced for that response, so unchanged pages can be
+    revalidated with a conditional request instead of re-downloaded.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the store.
+        :param path: JSON file to load from and save to; None keeps it in memory only.
+        """
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get the stored validators and analysis for a URL"""
+        return self.entries.get(url)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a URL"""
+        entry = self.entries.get(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def set(self, url: str, etag: Optional[str], last_modified: Optional[str], analysis: Dict[str, Any]):
+        """Store validators and analysis; responses without validators are not stored"""
+        if not etag and not last_modified:
+            self.entries.pop(url, None)
+            return
+        self.entries[url] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'analysis': copy.deepcopy(analysis)
+        }
+
+    def save(self):
+        """Write the store to disk atomically"""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Clear all stored validators"""
+        self.entries.clear()
+
+
+class AnalysisMemo:
+    """
+    Bounded LRU memo of page analyses keyed by a hash of the normalized body,
+    so byte-identical documents (re-scrapes, mirrors, duplicate URLs) are
+    parsed only once.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        """
+        Initialize the memo.
+        :param max_entries: Maximum number of analyses kept; least recently used are evicted.
+        """
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, body: Union[str, bytes], *context: Optional[str]) -> str:
+        """
+        Hash a body together with the context the analysis depends on.
+        Line endings and surrounding whitespace are normalized away first.
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        digest = hashlib.blake2b(body.replace(b'\r\n', b'\n').strip(), digest_size=16)
+        for value in context:
+            digest.update(b'\0' + (value or '').encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of a memoized analysis, counting the hit or miss"""
+        analysis = self.entries.get(key)
+        if analysis is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return copy.deepcopy(analysis)
+
+    def set(self, key: str, analysis: Dict[str, Any]):
+        """Memoize an analysis, evicting the least recently used entry when full"""
+        self.entries[key] = copy.deepcopy(analysis)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get memo size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self):
+        """Clear memoized analyses and reset counters"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,143 @@
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional
+import numpy as np
+
+# Words for term statistics: runs of letters, with inner apostrophes (don't, l'homme)
+TERM_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+SENTENCE_END_RE = re.compile(r'[.!?]+(?=\s|$)')
+VOWEL_GROUP_RE = re.compile(r'[aeiouyàáâäèéêëìíîïòóôöùúûü]+')
+
+# Elements that do not split a word when text runs across their boundary
+INLINE_TAGS = frozenset((
+    'a', 'abbr', 'b', 'bdi', 'bdo', 'cite', 'code', 'data', 'del', 'dfn', 'em', 'font', 'i', 'ins',
+    'kbd', 'mark', 'q', 's', 'samp', 'small', 'span', 'strong', 'sub', 'sup', 'time', 'u', 'var'
+))
+
+# Common English and Dutch function words left out of the top terms
+STOPWORDS = frozenset((
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'any', 'can', 'had', 'her', 'was', 'one',
+    'our', 'out', 'has', 'have', 'his', 'how', 'its', 'may', 'new', 'now', 'see', 'who', 'did', 'get',
+    'him', 'she', 'too', 'use', 'that', 'with', 'this', 'from', 'they', 'will', 'would', 'there',
+    'their', 'what', 'about', 'which', 'when', 'your', 'were', 'been', 'than', 'then', 'them', 'into',
+    'more', 'some', 'such', 'only', 'also', 'other', 'these', 'those', 'very', 'just', 'over', 'each',
+    'de', 'het', 'een', 'van', 'en', 'in', 'is', 'op', 'te', 'dat', 'die', 'voor', 'met', 'zijn', 'niet',
+    'aan', 'er', 'maar', 'om', 'ook', 'als', 'bij', 'dan', 'nog', 'wat', 'naar', 'uit', 'kan', 'door',
+    'wordt', 'worden', 'of', 'tot', 'meer', 'hun', 'onze', 'ons', 'deze', 'dit', 'jouw', 'uw', 'wij',
+    'zij', 'hij', 'ze', 'je', 'ik', 'geen', 'over', 'heeft', 'hebben', 'was', 'waren', 'al', 'wel', 'zo'
+))
+
+DEFAULT_TOP_TERMS = 10
+MIN_TERM_LENGTH = 3
+
+# Content terms kept with their counts for site-wide term indexing
+INDEXED_TERMS = 100
+
+MINHASH_PERMUTATIONS = 64
+# Fixed seed: signatures must be comparable across pages, processes and runs
+_minhash_random = np.random.default_rng(20240101)
+_MINHASH_A = _minhash_random.integers(0, 2 ** 63, MINHASH_PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_MINHASH_B = _minhash_random.integers(0, 2 ** 63, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+class ContentAnalytics:
+    """
+    Streaming visible-text statistics.
+
+    Text nodes are fed one at a time through add_text(), with break_text() at
+    block-level element boundaries. Nodes are buffered until their block
+    ends, so a word that runs across inline elements (<b>, <a>, ...) is
+    counted once; sentences are counted per block. Words and terms are counted
+    in one pass over all blocks when the result is built, so the regexes and
+    the counter run once per page rather than once per text node.
+    """
+
+    def __init__(self, top_terms: int = DEFAULT_TOP_TERMS):
+        self.top_terms = top_terms
+        self.word_count = 0
+        self.sentence_count = 0
+        self.terms: Counter = Counter()
+        self._block: List[str] = []
+        self._blocks: List[str] = []
+
+    def add_text(self, text: str):
+        """Add one visible text node"""
+        if text:
+            self._block.append(text)
+
+    def break_text(self):
+        """End the current block and count its sentences"""
+        if not self._block:
+            return
+        text = ''.join(self._block)
+        self._block.clear()
+        self._blocks.append(text)
+        if not TERM_RE.search(text):
+            return
+
+        sentence_start = 0
+        for match in SENTENCE_END_RE.finditer(text):
+            self.sentence_count += 1
+            sentence_start = match.end()
+        # Headings, list items and table cells often have no final period
+        if sentence_start == 0 or TERM_RE.search(text, sentence_start):
+            self.sentence_count += 1
+
+    def result(self) -> Dict[str, Any]:
+        """Build the content statistics"""
+        self.break_text()
+        if self._blocks:
+            # Blocks are joined on a line break, so no word or term spans two of them
+            text = '\n'.join(self._blocks)
+            self._blocks.clear()
+            self.word_count += len(text.split())
+            self.terms.update(TERM_RE.findall(text.lower()))
+        total_terms = sum(self.terms.values())
+        content_terms = [
+            (term, count) for term, count in self.terms.most_common()
+            if len(term) >= MIN_TERM_LENGTH and term not in STOPWORDS
+        ]
+        keywords = content_terms[:self.top_terms]
+        return {
+            'word_count': self.word_count,
+            'sentence_count': self.sentence_count,
+            'readability_score': self._readability(total_terms),
+            'top_terms': [{'term': term, 'count': count} for term, count in keywords],
+            'keyword_density': {
+                term: round(count * 100 / total_terms, 2) for term, count in keywords
+            },
+            'term_counts': dict(content_terms[:INDEXED_TERMS]),
+            'minhash': minhash(term for term, _ in content_terms)
+        }
+
+    def _readability(self, total_terms: int) -> Optional[float]:
+        """Flesch reading ease; syllables are estimated once per distinct term"""
+        if not total_terms or not self.sentence_count:
+            return None
+        syllables = sum(count_syllables(term) * count for term, count in self.terms.items())
+        score = 206.835 - 1.015 * (total_terms / self.sentence_count) - 84.6 * (syllables / total_terms)
+        return round(score, 1)
+
+
+def minhash(terms: Iterable[str]) -> Optional[str]:
+    """
+    MinHash signature of a set of terms, as hex: the minimum of each of
+    MINHASH_PERMUTATIONS hash functions over the terms. The share of equal
+    positions in two signatures estimates the Jaccard similarity of the sets.
+    None for an empty set.
+    """
+    hashes = np.fromiter((zlib.crc32(term.encode('utf-8')) for term in terms), dtype=np.uint64)
+    if not len(hashes):
+        return None
+    # Multiply-shift hashing; uint64 arithmetic wraps modulo 2^64 by design
+    values = (hashes[:, None] * _MINHASH_A + _MINHASH_B) >> np.uint64(32)
+    return values.min(axis=0).astype('<u4').tobytes().hex()
+
+
+def count_syllables(word: str) -> int:
+    """Estimate syllables as vowel groups, ignoring a silent final 'e'"""
+    groups = len(VOWEL_GROUP_RE.findall(word))
+    if groups > 1 and word.endswith('e') and not word.endswith(('le', 'ee')):
+        groups -= 1
+    return max(groups, 1)
@@ -0,0 +1,167 @@
+import asyncio
+from urllib.parse import urlsplit
+from typing import Dict, Any, AsyncIterable, AsyncIterator, Iterable, Optional, Set
+from .urls import normalize_url, site_host
+
+# Links to these are almost never HTML pages; skipping them saves a request each
+NON_PAGE_EXTENSIONS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.svg', '.ico', '.bmp',
+    '.pdf', '.zip', '.gz', '.rar', '.7z', '.mp3', '.mp4', '.webm', '.avi', '.mov',
+    '.css', '.js', '.json', '.xml', '.woff', '.woff2', '.ttf', '.eot',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx'
+)
+
+# Seed URLs are only pulled while the frontier holds fewer than concurrency * FEED_HIGH_WATER pages
+FEED_HIGH_WATER = 4
+
+_DONE = object()
+
+
+class SiteCrawler:
+    """
+    Breadth-first crawler over a site's internal links, built on SEOScraper.
+
+    Pages are fetched by a fixed pool of workers and yielded as they finish,
+    so only the frontier and the set of seen URLs are kept in memory. URLs are
+    normalized before deduplication, so each page is fetched once.
+    """
+
+    def __init__(self, scraper, max_pages: int = 500, max_depth: int = 5,
+                 concurrency: int = 10, per_host_limit: int = 4,
+                 scrape_options: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the crawler.
+        :param scraper: SEOScraper used to fetch and analyze every page.
+        :param max_pages: Maximum number of pages fetched, the seed included.
+        :param max_depth: Maximum link depth from the seed (the seed is depth 0).
+        :param concurrency: Number of pages fetched concurrently.
+        :param per_host_limit: Maximum number of concurrent fetches per host.
+        :param scrape_options: Extra keyword arguments for scrape_page(),
+            e.g. {'check_links': True}.
+        """
+        self.scraper = scraper
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+        self.scrape_options = scrape_options or {}
+        self.stats = {'pages_queued': 0, 'pages_crawled': 0, 'errors': 0}
+        self._site: Optional[str] = None
+        self._seen: Set[str] = set()
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def crawl(self, seed_url: str,
+                    seed_source: Optional[AsyncIterable[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Crawl the site of seed_url and yield each page's analysis as soon as it
+        is done, with 'url' and 'depth' added. Failed pages are yielded too,
+        with an 'error' key. Callers that stop iterating early should close the
+        generator (contextlib.aclosing) so the workers are cancelled promptly.
+        :param seed_source: Additional depth-0 URLs of the same site, e.g.
+            SitemapReader(scraper).iter_urls(seed_url). It is consumed lazily,
+            only as fast as the workers drain the frontier. If it raises, the
+            pages queued so far are still crawled and the error is raised then.
+        """
+        seed = normalize_url(seed_url)
+        if seed is None:
+            raise ValueError(f"Invalid seed URL: {seed_url}")
+
+        self._site = site_host(seed)
+        self._seen = set()
+        self.stats = {'pages_queued': 0, 'pages_crawled': 0, 'errors': 0}
+        frontier: asyncio.Queue = asyncio.Queue()
+        # Bounded, so workers pause while the consumer falls behind
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        self._enqueue(frontier, [seed], 0)
+        frontier_low = asyncio.Event()
+
+        opened_here = not self.scraper.is_open
+        if opened_here:
+            await self.scraper.open()
+
+        async def feed_seeds():
+            try:
+                async for url in seed_source:
+                    if self.stats['pages_queued'] >= self.max_pages:
+                        break
+                    while frontier.qsize() >= self.concurrency * FEED_HIGH_WATER:
+                        frontier_low.clear()
+                        await frontier_low.wait()
+                    self._enqueue(frontier, [url], 0)
+            finally:
+                if hasattr(seed_source, 'aclose'):
+                    await seed_source.aclose()
+
+        seed_errors = []
+
+        async def signal_done():
+            try:
+                if seed_source is not None:
+                    await feed_seeds()
+            except Exception as e:
+                # The pages already queued are still crawled; crawl() raises the error afterwards
+                seed_errors.append(e)
+            await frontier.join()
+            await results.put(_DONE)
+
+        tasks = [
+            asyncio.create_task(self._worker(frontier, results, frontier_low))
+            for _ in range(self.concurrency)
+        ]
+        tasks.append(asyncio.create_task(signal_done()))
+        try:
+            while True:
+                page = await results.get()
+                if page is _DONE:
+                    break
+                yield page
+            if seed_errors:
+                raise seed_errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if opened_here:
+                await self.scraper.close()
+
+    async def _worker(self, frontier: asyncio.Queue, results: asyncio.Queue, frontier_low: asyncio.Event):
+        """Fetch pages from the frontier until cancelled"""
+        while True:
+            url, depth = await frontier.get()
+            if frontier.qsize() < self.concurrency:
+                frontier_low.set()
+            try:
+                host_limit = self._host_limits.setdefault(
+                    urlsplit(url).netloc, asyncio.Semaphore(self.per_host_limit)
+                )
+                async with host_limit:
+                    analysis = await self.scraper.scrape_page(url, **self.scrape_options)
+
+                self.stats['pages_crawled'] += 1
+                if analysis.get('redirect', {}).get('final_url'):
+                    # The redirect target was fetched under this URL; don't crawl it again
+                    self._seen.add(analysis['redirect']['final_url'])
+                if 'error' in analysis:
+                    self.stats['errors'] += 1
+                elif depth < self.max_depth:
+                    # Queued before task_done(), so the frontier never looks empty too early
+                    self._enqueue(frontier, analysis['links']['internal_urls'], depth + 1)
+                await results.put({'url': url, 'depth': depth, **analysis})
+            finally:
+                frontier.task_done()
+
+    def _enqueue(self, frontier: asyncio.Queue, urls: Iterable[str], depth: int):
+        """Queue unseen internal page URLs while the page budget lasts"""
+        for url in urls:
+            if self.stats['pages_queued'] >= self.max_pages:
+                return
+            url = normalize_url(url)
+            if url is None or url in self._seen or not self._is_crawlable(url):
+                continue
+            self._seen.add(url)
+            self.stats['pages_queued'] += 1
+            frontier.put_nowait((url, depth))
+
+    def _is_crawlable(self, url: str) -> bool:
+        """Check that a URL is on the crawled site and looks like a page"""
+        return site_host(url) == self._site and not urlsplit(url).path.lower().endswith(NON_PAGE_EXTENSIONS)
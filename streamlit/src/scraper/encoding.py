@@ -0,0 +1,68 @@
+import codecs
+import re
+from typing import Optional, Tuple
+
+DEFAULT_ENCODING = 'utf-8'
+
+# How far into the document a <meta> charset declaration is looked for
+META_PRESCAN_BYTES = 4096
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_BE, 'utf-16be'),
+    (codecs.BOM_UTF16_LE, 'utf-16le'),
+)
+
+HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?\s*([\w:.\-]+)', re.IGNORECASE)
+# Python codec names that libxml2 (lxml) spells differently; most names are shared
+LIBXML2_NAMES = {
+    'euc_jp': 'euc-jp',
+    'euc_kr': 'euc-kr',
+    'iso2022_jp': 'iso-2022-jp',
+    'mac-roman': 'macintosh',
+    'utf-16-be': 'utf-16be',
+    'utf-16-le': 'utf-16le',
+}
+
+META_CHARSET_RE = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([\w:.\-]+)', re.IGNORECASE)
+
+
+def sniff_encoding(body: bytes, content_type: str = '') -> Tuple[str, bytes]:
+    """
+    Determine a document's encoding without statistical detection.
+    Precedence: byte order mark, Content-Type charset, <meta> charset in the
+    first few KB, then UTF-8.
+    :return: The encoding and the body with any byte order mark removed.
+    """
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding, body[len(bom):]
+
+    match = HEADER_CHARSET_RE.search(content_type or '')
+    encoding = _normalize_encoding(match.group(1)) if match else None
+    if encoding:
+        return encoding, body
+
+    match = META_CHARSET_RE.search(body, 0, META_PRESCAN_BYTES)
+    encoding = _normalize_encoding(match.group(1).decode('ascii', errors='ignore')) if match else None
+    if encoding:
+        # A UTF-16 declaration in ASCII-compatible markup cannot be true
+        return (DEFAULT_ENCODING if encoding.startswith('utf-16') else encoding), body
+
+    return DEFAULT_ENCODING, body
+
+
+def _normalize_encoding(name: str) -> Optional[str]:
+    """
+    Return a canonical name for a declared encoding, or None if Python does not
+    know it as a text encoding. Aliases (latin-1, utf_8, ...) are resolved to
+    Python's codec name, spelled the way libxml2 expects where the two differ,
+    since lxml passes the name to libxml2 unchanged.
+    """
+    try:
+        codec = codecs.lookup(name)
+    except LookupError:
+        return None
+    if not getattr(codec, '_is_text_encoding', True):
+        return None
+    return LIBXML2_NAMES.get(codec.name, codec.name)
@@ -0,0 +1,253 @@
+"""
+Local fixture site for offline scraper and crawler benchmarks.
+
+Serves a synthetic site (or pages recorded in a ResponseArchive) together with
+robots.txt and gzipped sitemaps, with injectable latency, page size and errors.
+Run from the streamlit/ directory to serve it standalone:
+    python -m src.scraper.fixture_server --pages 1000 --latency 0.05 --port 8765
+"""
+import argparse
+import asyncio
+import gzip
+import random
+from urllib.parse import urlsplit
+from aiohttp import web
+from typing import Dict, Any, List, Optional, Sequence
+from .archive import ResponseArchive
+
+SITEMAP_CHUNK = 50000
+
+# Site-wide bundles every synthetic page references
+STATIC_ASSETS = {
+    'site.css': ('text/css', 'body{font-family:sans-serif;margin:0 auto;max-width:60em}\n' * 400),
+    'app.js': ('application/javascript', 'document.documentElement.classList.add("js");\n' * 600)
+}
+
+
+class FixtureServer:
+    """
+    aiohttp server for a reproducible test site.
+
+    Synthetic pages live at /page/<n>; each links to its successors and a few
+    seeded random pages, so a crawl from / reaches the whole site. All
+    injected randomness comes from a seeded generator, so runs are repeatable.
+    """
+
+    def __init__(self, pages: int = 500, sections: int = 20, links_per_page: int = 10,
+                 latency: float = 0.0, latency_jitter: float = 0.0,
+                 slow_rate: float = 0.0, slow_latency: float = 1.0,
+                 error_rate: float = 0.0, error_statuses: Sequence[int] = (500, 503),
+                 crawl_delay: Optional[float] = None, disallow: Sequence[str] = (),
+                 corpus: Optional[ResponseArchive] = None, seed: int = 0,
+                 host: str = '127.0.0.1', port: int = 0):
+        """
+        Initialize the server.
+        :param pages: Number of synthetic pages.
+        :param sections: Content sections per page; controls page size.
+        :param links_per_page: Internal links per page.
+        :param latency: Base delay in seconds before every response.
+        :param latency_jitter: Extra uniformly random delay of up to this many seconds.
+        :param slow_rate: Share of responses delayed by slow_latency (tail latency).
+        :param slow_latency: Delay of the slow responses in seconds.
+        :param error_rate: Share of page responses replaced by an error status.
+        :param error_statuses: Statuses the injected errors are drawn from.
+        :param crawl_delay: Crawl-delay announced in robots.txt.
+        :param disallow: Paths disallowed in robots.txt.
+        :param corpus: Archive of recorded pages, served by URL path instead of synthetic pages.
+        :param seed: Seed for links, latency and error injection.
+        :param host: Interface to bind.
+        :param port: Port to bind; 0 picks a free one.
+        """
+        self.pages = pages
+        self.sections = sections
+        self.links_per_page = links_per_page
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.crawl_delay = crawl_delay
+        self.disallow = tuple(disallow)
+        self.seed = seed
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._corpus: Dict[str, Dict[str, Any]] = {}
+        if corpus is not None:
+            for record in corpus.iter_records():
+                parts = urlsplit(record['url'])
+                self._corpus[parts.path + (f"?{parts.query}" if parts.query else '')] = record
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        """URL of the site root"""
+        return f"http://{self.host}:{self.port}"
+
+    async def __aenter__(self) -> 'FixtureServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def start(self) -> str:
+        """Start serving and return the base URL"""
+        app = web.Application()
+        app.router.add_get('/robots.txt', self._robots)
+        app.router.add_get('/sitemap_index.xml', self._sitemap_index)
+        app.router.add_get('/sitemap-{number}.xml.gz', self._sitemap)
+        app.router.add_get('/static/{name}', self._static)
+        app.router.add_route('*', '/{tail:.*}', self._page)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.base_url
+
+    async def stop(self):
+        """Stop serving"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def page_urls(self) -> List[str]:
+        """URLs of all pages the site serves"""
+        if self._corpus:
+            return [self.base_url + path for path in self._corpus]
+        return [self._page_url(number) for number in range(self.pages)]
+
+    async def _robots(self, request: web.Request) -> web.Response:
+        lines = ['User-agent: *']
+        lines.extend(f"Disallow: {path}" for path in self.disallow)
+        if self.crawl_delay is not None:
+            lines.append(f"Crawl-delay: {self.crawl_delay}")
+        lines.append(f"Sitemap: {self.base_url}/sitemap_index.xml")
+        return web.Response(text='\n'.join(lines) + '\n')
+
+    async def _sitemap_index(self, request: web.Request) -> web.Response:
+        count = (len(self.page_urls()) + SITEMAP_CHUNK - 1) // SITEMAP_CHUNK
+        entries = ''.join(
+            f"<sitemap><loc>{self.base_url}/sitemap-{number}.xml.gz</loc></sitemap>" for number in range(count)
+        )
+        return web.Response(
+            text=f'<?xml version="1.0" encoding="UTF-8"?>'
+                 f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>',
+            content_type='application/xml'
+        )
+
+    async def _sitemap(self, request: web.Request) -> web.Response:
+        number = int(request.match_info['number'])
+        urls = self.page_urls()[number * SITEMAP_CHUNK:(number + 1) * SITEMAP_CHUNK]
+        if not urls:
+            raise web.HTTPNotFound()
+        entries = ''.join(f"<url><loc>{url}</loc><lastmod>2024-01-01</lastmod></url>" for url in urls)
+        body = (f'<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>')
+        return web.Response(body=gzip.compress(body.encode('utf-8')), content_type='application/gzip')
+
+    async def _static(self, request: web.Request) -> web.Response:
+        asset = STATIC_ASSETS.get(request.match_info['name'])
+        if asset is None:
+            raise web.HTTPNotFound()
+        content_type, text = asset
+        return web.Response(text=text, content_type=content_type)
+
+    async def _page(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        await asyncio.sleep(self._delay())
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.Response(status=self._random.choice(self.error_statuses))
+
+        if self._corpus:
+            record = self._corpus.get(request.path_qs)
+            if record is None:
+                raise web.HTTPNotFound()
+            content_type = record['headers'].get('content-type', 'text/html')
+            return web.Response(status=record['status'], body=record['body'], headers={'Content-Type': content_type})
+
+        path = request.path
+        if path == '/':
+            number = 0
+        elif path.startswith('/page/') and path[6:].isdigit() and int(path[6:]) < self.pages:
+            number = int(path[6:])
+        else:
+            raise web.HTTPNotFound()
+        return web.Response(text=self._render_page(number), content_type='text/html')
+
+    def _delay(self) -> float:
+        delay = self.latency
+        if self.latency_jitter:
+            delay += self._random.uniform(0, self.latency_jitter)
+        if self.slow_rate and self._random.random() < self.slow_rate:
+            delay += self.slow_latency
+        return delay
+
+    def _page_url(self, number: int) -> str:
+        return f"{self.base_url}/page/{number}" if number else f"{self.base_url}/"
+
+    def _render_page(self, number: int) -> str:
+        """Deterministic synthetic page; the same number always renders the same HTML"""
+        page_random = random.Random(self.seed * 1000003 + number)
+        targets = [(number + offset) % self.pages for offset in range(1, 4)]
+        targets += [page_random.randrange(self.pages) for _ in range(max(0, self.links_per_page - 3))]
+        links = ''.join(
+            f'<li><a href="{urlsplit(self._page_url(target)).path}">Page {target}</a></li>' for target in targets
+        )
+        sections = ''.join(
+            f'<section><h2>Section {i}</h2><p>Page {number} section {i} covers search engine '
+            f'optimisation, internal linking and <b>content</b> quality for fixture testing.</p>'
+            f'<img src="/img/{number}-{i}.png" alt="Illustration {i}"></section>'
+            for i in range(self.sections)
+        )
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8">'
+            f'<title>Fixture page {number}</title>'
+            f'<meta name="description" content="Fixture page {number} for offline benchmarks">'
+            '<meta name="viewport" content="width=device-width, initial-scale=1">'
+            f'<link rel="canonical" href="{self._page_url(number)}">'
+            '<link rel="stylesheet" href="/static/site.css">'
+            '<script src="/static/app.js" defer></script>'
+            f'</head><body><h1>Fixture page {number}</h1><nav><ul>{links}</ul></nav>{sections}'
+            '<a href="https://external.example.org/">External</a></body></html>'
+        )
+
+
+async def _serve(args: argparse.Namespace):
+    corpus = ResponseArchive(args.corpus) if args.corpus else None
+    server = FixtureServer(
+        pages=args.pages, sections=args.sections, latency=args.latency, latency_jitter=args.jitter,
+        slow_rate=args.slow_rate, slow_latency=args.slow_latency, error_rate=args.error_rate,
+        corpus=corpus, seed=args.seed, host=args.host, port=args.port
+    )
+    print(f"Serving fixture site at {await server.start()}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local fixture site for scraper benchmarks')
+    parser.add_argument('--pages', type=int, default=500, help='Number of synthetic pages')
+    parser.add_argument('--sections', type=int, default=20, help='Content sections per page')
+    parser.add_argument('--latency', type=float, default=0.0, help='Base response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra delay of up to this many seconds')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='Share of responses that are slow')
+    parser.add_argument('--slow-latency', type=float, default=1.0, help='Delay of slow responses in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of responses that fail')
+    parser.add_argument('--corpus', help='ResponseArchive directory of recorded pages to serve')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for links and injected faults')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8765, help='Port to bind')
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import re
+import struct
+import aiohttp
+from typing import Dict, Any, Iterable, Optional
+from .probe import URLProbe
+
+# Enough for the dimensions of every supported format, including JPEGs with large EXIF blocks
+DEFAULT_PROBE_BYTES = 64 * 1024
+
+CONTENT_RANGE_TOTAL_RE = re.compile(r'/\s*(\d+)\s*$')
+
+# JPEG start-of-frame markers (C4, C8 and CC are DHT, JPG and DAC)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+class ImageAuditor(URLProbe):
+    """
+    Image weight audit.
+    Each unique image URL is fetched once with a small Range request: the byte
+    size comes from Content-Range (or Content-Length) and the format and pixel
+    dimensions from the header bytes, without downloading the full image.
+    """
+
+    def __init__(self, scraper, max_concurrency: int = 50, per_host_limit: int = 4,
+                 path: Optional[str] = None, probe_bytes: int = DEFAULT_PROBE_BYTES,
+                 heavy_image_bytes: int = 200 * 1024):
+        """
+        Initialize the auditor.
+        :param probe_bytes: Bytes requested from the start of each image.
+        :param heavy_image_bytes: Size from which an image is reported as heavy.
+        """
+        super().__init__(scraper, max_concurrency, per_host_limit, path)
+        self.probe_bytes = probe_bytes
+        self.heavy_image_bytes = heavy_image_bytes
+
+    async def audit_images(self, session: aiohttp.ClientSession, urls: Iterable[str]) -> Dict[str, Any]:
+        """Size every image concurrently and summarize the page's image weight"""
+        results = await self.probe_all(session, urls)
+        sized = [result for result in results if result.get('bytes') is not None]
+        return {
+            'total_bytes': sum(result['bytes'] for result in sized),
+            'unsized_images': len(results) - len(sized),
+            'heavy_images': [result for result in sized if result['bytes'] >= self.heavy_image_bytes],
+            'images': results
+        }
+
+    async def _probe(self, session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+        """Read the first probe_bytes of an image"""
+        headers = {'Range': f"bytes=0-{self.probe_bytes - 1}"}
+        async with await self.scraper.request(session, 'GET', url, headers=headers) as response:
+            result = {
+                'url': url,
+                'status': response.status,
+                'bytes': self._total_size(response),
+                'content_type': response.headers.get('content-type', '')
+            }
+            if response.status >= 400:
+                return {**result, 'bytes': None, 'format': None, 'width': None, 'height': None}
+
+            data = bytearray()
+            while len(data) < self.probe_bytes:
+                chunk = await response.content.read(self.probe_bytes - len(data))
+                if not chunk:
+                    break
+                data.extend(chunk)
+            if not response.content.at_eof():
+                # The server ignored Range; drop the connection instead of draining the image
+                response.close()
+
+        return {**result, **parse_image_header(bytes(data))}
+
+    def _total_size(self, response: aiohttp.ClientResponse) -> Optional[int]:
+        """Full image size from Content-Range on 206, Content-Length otherwise"""
+        if response.status == 206:
+            match = CONTENT_RANGE_TOTAL_RE.search(response.headers.get('content-range', ''))
+            return int(match.group(1)) if match else None
+        return response.content_length
+
+
+def parse_image_header(data: bytes) -> Dict[str, Any]:
+    """Detect the image format and pixel dimensions from the leading bytes"""
+    width = height = None
+    image_format = None
+
+    if data.startswith(b'\x89PNG\r\n\x1a\n') and len(data) >= 24:
+        image_format = 'png'
+        width, height = struct.unpack('>II', data[16:24])
+    elif data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        image_format = 'gif'
+        width, height = struct.unpack('<HH', data[6:10])
+    elif data.startswith(b'\xff\xd8'):
+        image_format = 'jpeg'
+        width, height = _jpeg_size(data)
+    elif data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        image_format = 'webp'
+        width, height = _webp_size(data)
+    elif data[4:8] == b'ftyp':
+        image_format = 'avif' if data[8:12] in (b'avif', b'avis') else 'heif'
+        box = data.find(b'ispe')
+        if box != -1 and len(data) >= box + 16:
+            width, height = struct.unpack('>II', data[box + 8:box + 16])
+    elif data.startswith(b'BM') and len(data) >= 26:
+        image_format = 'bmp'
+        width, height = struct.unpack('<ii', data[18:26])
+        height = abs(height)
+    elif data.startswith(b'\x00\x00\x01\x00') and len(data) >= 8:
+        image_format = 'ico'
+        width, height = data[6] or 256, data[7] or 256
+    elif b'<svg' in data[:1024]:
+        image_format = 'svg'
+
+    return {'format': image_format, 'width': width, 'height': height}
+
+
+def _jpeg_size(data: bytes):
+    """Walk JPEG segments up to the first start-of-frame marker"""
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+    return None, None
+
+
+def _webp_size(data: bytes):
+    """Read dimensions from a lossy, lossless or extended WebP header"""
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30:
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(data) >= 25:
+        bits = struct.unpack('<I', data[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(data) >= 30:
+        width = int.from_bytes(data[24:27], 'little') + 1
+        height = int.from_bytes(data[27:30], 'little') + 1
+        return width, height
+    return None, None
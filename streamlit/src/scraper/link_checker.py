@@ -0,0 +1,36 @@
+import aiohttp
+from typing import Dict, Any, Iterable, List
+from .probe import URLProbe
+
+
+class LinkChecker(URLProbe):
+    """
+    Concurrent broken-link checker.
+    Each URL is checked once per instance (see URLProbe), so a link that
+    appears on 500 pages is requested a single time. Redirects are followed
+    through the scraper's RedirectResolver, whose chains are shared with the
+    crawl, so a redirecting link costs nothing once its chain is known.
+    """
+
+    async def check_links(self, session: aiohttp.ClientSession, urls: Iterable[str]) -> List[Dict[str, Any]]:
+        """Check URLs concurrently and return the broken ones"""
+        results = await self.probe_all(session, urls)
+        return [result for result in results if result['broken']]
+
+    async def _probe(self, session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+        """Resolve the URL's redirect chain; the link is broken if it ends in an error or a loop"""
+        redirect = await self.scraper.redirect_resolver.probe_url(session, url)
+        if redirect.get('error'):
+            return self._failure(url, redirect['error'])
+
+        status = redirect['status']
+        result = {'url': url, 'status': status, 'broken': status is None or status >= 400}
+        if redirect['hops']:
+            result['final_url'] = redirect['final_url']
+            result['redirect_hops'] = redirect['hops']
+        if redirect['loop'] or redirect['too_long']:
+            result['error'] = 'Redirect loop' if redirect['loop'] else 'Too many redirects'
+        return result
+
+    def _failure(self, url: str, error: str) -> Dict[str, Any]:
+        return {'url': url, 'status': None, 'broken': True, 'error': error}
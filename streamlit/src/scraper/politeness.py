@@ -0,0 +1,166 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+# Mirrors Settings.RATE_LIMITS['scraper']; applied per host
+DEFAULT_RATE_LIMIT = {'calls': 60, 'period': 'minute'}
+
+PERIOD_SECONDS = {'day': 86400, 'hour': 3600, 'minute': 60, 'second': 1}
+
+# Statuses that mean the host wants us to slow down
+BACKOFF_STATUSES = (429, 503)
+
+
+class HostState:
+    """Token bucket, adaptive concurrency limit and latency estimate of one host"""
+
+    def __init__(self, burst: int, initial_concurrency: float):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.limit = initial_concurrency
+        self.in_flight = 0
+        self.waiters: deque = deque()
+        self.latency: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self.last_decrease = 0.0
+
+
+class PolitenessScheduler:
+    """
+    Per-host request scheduler.
+
+    Every request to a host takes a token from the host's bucket, refilled at
+    the configured rate or, when robots.txt sets one, at one per Crawl-delay
+    (without bursts). Concurrency per host follows AIMD: the limit grows by
+    roughly one per round trip while responses stay fast and error free, and
+    is halved on 429/503, connection errors or latency well above the
+    host's baseline. Hosts are independent, so a crawl over many hosts runs
+    at full speed while no single host is overloaded.
+    """
+
+    def __init__(self, rate_limit: Optional[Dict[str, Any]] = None, burst: int = 5,
+                 min_concurrency: int = 1, max_concurrency: int = 8, initial_concurrency: int = 2,
+                 backoff_factor: float = 0.5, latency_factor: float = 2.0):
+        """
+        Initialize the scheduler.
+        :param rate_limit: Requests per period per host, as in Settings.RATE_LIMITS['scraper'].
+        :param burst: Requests a host may receive back to back after being idle.
+        :param min_concurrency: Lowest concurrency limit per host.
+        :param max_concurrency: Highest concurrency limit per host.
+        :param initial_concurrency: Concurrency limit of a host not seen before.
+        :param backoff_factor: Factor the limit is multiplied by on a backoff signal.
+        :param latency_factor: Latency, relative to the host's baseline, that counts as congestion.
+        """
+        rate_limit = rate_limit or DEFAULT_RATE_LIMIT
+        if rate_limit['period'] not in PERIOD_SECONDS:
+            raise ValueError(f"Unknown period: {rate_limit['period']}")
+        self.interval = PERIOD_SECONDS[rate_limit['period']] / rate_limit['calls']
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.initial_concurrency = initial_concurrency
+        self.backoff_factor = backoff_factor
+        self.latency_factor = latency_factor
+        self.hosts: Dict[str, HostState] = {}
+
+    async def acquire(self, host: str, crawl_delay: Optional[float] = None):
+        """
+        Wait for a concurrency slot and a token for the host.
+        Every acquire() must be followed by release().
+        """
+        state = self._get_state(host)
+        await self._acquire_slot(state)
+        try:
+            delay = self._take_token(state, crawl_delay)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._release_slot(state)
+            raise
+
+    def release(self, host: str, status: Optional[int] = None, latency: Optional[float] = None,
+                error: bool = False):
+        """
+        Give the host's slot back and adapt its concurrency limit.
+        :param status: Response status, if a response was received.
+        :param latency: Seconds until the response headers arrived.
+        :param error: Whether the request failed without a response.
+        """
+        state = self.hosts[host]
+        now = time.monotonic()
+        if error or status in BACKOFF_STATUSES:
+            self._decrease(state, now)
+        elif latency is not None:
+            if state.latency is None:
+                state.latency = state.baseline_latency = latency
+            else:
+                state.latency += 0.2 * (latency - state.latency)
+                # The baseline follows the fastest recent latency and drifts up slowly
+                drift = 0.01 * (state.latency - state.baseline_latency)
+                state.baseline_latency = min(state.latency, state.baseline_latency + drift)
+            if state.latency > state.baseline_latency * self.latency_factor:
+                self._decrease(state, now)
+            else:
+                state.limit = min(self.max_concurrency, state.limit + 1 / state.limit)
+        self._release_slot(state)
+
+    def get_state(self, host: str) -> Dict[str, Any]:
+        """Get the host's current concurrency limit, requests in flight and latency"""
+        state = self.hosts.get(host)
+        if state is None:
+            return {'limit': self.initial_concurrency, 'in_flight': 0, 'latency': None}
+        return {'limit': int(state.limit), 'in_flight': state.in_flight, 'latency': state.latency}
+
+    def _get_state(self, host: str) -> HostState:
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState(self.burst, self.initial_concurrency)
+        return state
+
+    async def _acquire_slot(self, state: HostState):
+        """Wait until the host has fewer requests in flight than its limit"""
+        if state.in_flight < int(state.limit) and not state.waiters:
+            state.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation
+                self._release_slot(state)
+            elif waiter in state.waiters:
+                state.waiters.remove(waiter)
+            raise
+
+    def _release_slot(self, state: HostState):
+        """Free a slot and hand free slots to waiting requests"""
+        state.in_flight -= 1
+        while state.waiters and state.in_flight < int(state.limit):
+            waiter = state.waiters.popleft()
+            if not waiter.done():
+                state.in_flight += 1
+                waiter.set_result(None)
+
+    def _take_token(self, state: HostState, crawl_delay: Optional[float]) -> float:
+        """
+        Take a token and return how long to wait for it.
+        Tokens may go negative: each waiting request reserves the next free
+        slot in time, so waiters are spaced by the interval instead of racing.
+        """
+        interval = max(self.interval, crawl_delay or 0.0)
+        burst = 1 if crawl_delay else self.burst
+        now = time.monotonic()
+        state.tokens = min(burst, state.tokens + (now - state.updated) / interval)
+        state.updated = now
+        state.tokens -= 1
+        return -state.tokens * interval if state.tokens < 0 else 0.0
+
+    def _decrease(self, state: HostState, now: float):
+        """Multiplicative decrease, at most once per round trip"""
+        if now - state.last_decrease < (state.latency or 0.0):
+            return
+        state.limit = max(self.min_concurrency, state.limit * self.backoff_factor)
+        state.last_decrease = now
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+from urllib.parse import urlsplit
+import aiohttp
+from typing import Dict, Any, Iterable, List, Optional
+from .resilience import CircuitOpenError
+
+
+class URLProbe:
+    """
+    Base class for concurrent per-URL checks (link status, image size, ...).
+
+    Each URL is probed once: results are kept in a cache shared by every page
+    that goes through this instance, optionally persisted to a JSON file, and
+    concurrent probes of the same URL wait on the request already in flight.
+    Concurrency is capped globally and per host. Subclasses implement _probe().
+    """
+
+    def __init__(self, scraper, max_concurrency: int = 50, per_host_limit: int = 4,
+                 path: Optional[str] = None):
+        """
+        Initialize the probe.
+        :param scraper: SEOScraper whose session, retry policy and circuit breaker are used.
+        :param max_concurrency: Maximum number of probes in flight overall.
+        :param per_host_limit: Maximum number of probes in flight per host.
+        :param path: JSON file the result cache is loaded from and saved to.
+        """
+        self.scraper = scraper
+        self.per_host_limit = per_host_limit
+        self.path = path
+        self.results: Dict[str, Dict[str, Any]] = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.results = json.load(f)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._global_limit = asyncio.Semaphore(max_concurrency)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def probe_all(self, session: aiohttp.ClientSession, urls: Iterable[str]) -> List[Dict[str, Any]]:
+        """Probe URLs concurrently; results are returned in first-seen order without duplicates"""
+        unique_urls = list(dict.fromkeys(urls))
+        return list(await asyncio.gather(*(self.probe_url(session, url) for url in unique_urls)))
+
+    async def probe_url(self, session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+        """Probe a single URL, reusing a cached or in-flight result"""
+        if url in self.results:
+            return self.results[url]
+        if url in self._in_flight:
+            return await asyncio.shield(self._in_flight[url])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[url] = future
+        try:
+            host_limit = self._host_limits.setdefault(urlsplit(url).netloc, asyncio.Semaphore(self.per_host_limit))
+            async with self._global_limit, host_limit:
+                try:
+                    result = await self._probe(session, url)
+                except asyncio.TimeoutError:
+                    result = self._failure(url, 'Request timed out')
+                except (aiohttp.ClientError, CircuitOpenError, ValueError) as e:
+                    result = self._failure(url, str(e))
+            if self._cacheable(result):
+                self.results[url] = result
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Nobody else may be awaiting the future; keep asyncio from warning about it
+                future.exception()
+            raise
+        finally:
+            del self._in_flight[url]
+
+    async def _probe(self, session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+        """Probe one URL; implemented by subclasses"""
+        raise NotImplementedError
+
+    def _cacheable(self, result: Dict[str, Any]) -> bool:
+        """Whether a result is reused for later probes of its URL"""
+        return True
+
+    def _failure(self, url: str, error: str) -> Dict[str, Any]:
+        """Result recorded when the request itself failed"""
+        return {'url': url, 'status': None, 'error': error}
+
+    def save(self):
+        """Write the result cache to disk atomically; failed requests are not persisted"""
+        if not self.path:
+            return
+        results = {url: result for url, result in self.results.items() if not result.get('error')}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Forget all cached results"""
+        self.results.clear()
@@ -0,0 +1,144 @@
+from urllib.parse import urljoin
+import aiohttp
+from typing import Dict, Any, List, Optional, Tuple
+from .probe import URLProbe
+from .urls import normalize_url
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# Statuses for which servers commonly reject HEAD although GET would work
+HEAD_UNSUPPORTED_STATUSES = (403, 405, 501)
+
+# Same default as aiohttp's max_redirects
+DEFAULT_MAX_HOPS = 10
+
+
+class RedirectResolver(URLProbe):
+    """
+    Redirect chain resolver.
+
+    Hops are followed one request at a time (allow_redirects=False), so the
+    full chain is recorded and loops are detected. Resolved chains are cached
+    per URL (see URLProbe) and every URL along a chain gets its own suffix of
+    it, so a redirecting URL that is linked from many pages, or that is the
+    tail of several chains, is resolved once for the whole crawl. Failed
+    requests and chains ending in a transient status (429, 5xx) are not
+    cached, so they are resolved again the next time.
+    """
+
+    def __init__(self, scraper, max_concurrency: int = 50, per_host_limit: int = 4,
+                 path: Optional[str] = None, max_hops: int = DEFAULT_MAX_HOPS):
+        """
+        Initialize the resolver.
+        :param max_hops: Longest chain that is followed before giving up.
+        """
+        super().__init__(scraper, max_concurrency, per_host_limit, path)
+        self.max_hops = max_hops
+        self.hops: Dict[str, Tuple[int, Optional[str]]] = {}
+
+    def record_hop(self, url: str, status: int, location: Optional[str]):
+        """
+        Remember a response already received for a URL, so resolving it does not
+        request it again. A chain cached for the URL is out of date and dropped.
+        """
+        self.results.pop(url, None)
+        self.hops[url] = (status, location)
+
+    def extend(self, result: Dict[str, Any], tail: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Continue a resolved chain whose final URL turned out to redirect after
+        all (HEAD and GET answered differently, or the redirect changed) with
+        the chain resolved from that URL.
+        """
+        if tail.get('error'):
+            return {**tail, 'url': result['url'], 'chain': result['chain'], 'hops': result['hops']}
+        chain = result['chain'] + tail['chain']
+        hop_urls = [hop['url'] for hop in chain]
+        loop = tail['loop'] or len(set(hop_urls)) < len(hop_urls)
+        too_long = tail['too_long'] or len(chain) > self.max_hops
+        extended = self._result(result['url'], chain, tail['final_url'], None if loop or too_long else tail['status'],
+                                loop, too_long and not loop)
+        if self._cacheable(extended):
+            self.results[result['url']] = extended
+        return extended
+
+    def chains(self) -> List[Dict[str, Any]]:
+        """Resolved URLs that take more than one hop or end in a loop"""
+        return [result for result in self.results.values() if result.get('hops', 0) > 1 or result.get('loop')]
+
+    async def _probe(self, session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+        """Follow the chain hop by hop, splicing in chains resolved before"""
+        chain: List[Dict[str, Any]] = []
+        seen = {url}
+        current = url
+        while True:
+            cached = self.results.get(current) if current != url else None
+            if cached is not None and not cached.get('error'):
+                result = self._result(url, chain + cached['chain'], cached['final_url'], cached['status'],
+                                      cached['loop'], cached['too_long'])
+                break
+
+            status, location = await self._hop(session, current)
+            if location is None:
+                result = self._result(url, chain, current, status)
+                break
+            target = normalize_url(urljoin(current, location))
+            chain.append({'url': current, 'status': status, 'location': target})
+            if target is None:
+                result = self._result(url, chain, None, status)
+                break
+            if target in seen:
+                result = self._result(url, chain, target, None, loop=True)
+                break
+            if len(chain) >= self.max_hops:
+                result = self._result(url, chain, target, None, too_long=True)
+                break
+            seen.add(target)
+            current = target
+
+        # Every URL along the chain resolves to the rest of it
+        for i in range(1, len(chain)):
+            hop_url = chain[i]['url']
+            if hop_url not in self.results and self._cacheable(result):
+                self.results[hop_url] = self._result(hop_url, chain[i:], result['final_url'], result['status'],
+                                                     result['loop'], result['too_long'])
+        return result
+
+    async def _hop(self, session: aiohttp.ClientSession, url: str) -> Tuple[int, Optional[str]]:
+        """Status and redirect target of one URL; HEAD first, GET when HEAD is rejected"""
+        if url in self.hops:
+            return self.hops.pop(url)
+        async with await self.scraper.request(session, 'HEAD', url, allow_redirects=False) as response:
+            status, location = response.status, redirect_location(response)
+        if status in HEAD_UNSUPPORTED_STATUSES:
+            # Only the status line and headers are needed; the body is released unread
+            async with await self.scraper.request(session, 'GET', url, allow_redirects=False) as response:
+                status, location = response.status, redirect_location(response)
+        return status, location
+
+    def _result(self, url: str, chain: List[Dict[str, Any]], final_url: Optional[str], status: Optional[int],
+                loop: bool = False, too_long: bool = False) -> Dict[str, Any]:
+        return {
+            'url': url,
+            'final_url': final_url,
+            'status': status,
+            'chain': chain,
+            'hops': len(chain),
+            'loop': loop,
+            'too_long': too_long
+        }
+
+    def _cacheable(self, result: Dict[str, Any]) -> bool:
+        """Failures and chains ending in a transient status are resolved again next time"""
+        status = result['status']
+        return not result.get('error') and not (status is not None and (status == 429 or status >= 500))
+
+    def _failure(self, url: str, error: str) -> Dict[str, Any]:
+        return {**self._result(url, [], None, None), 'error': error}
+
+
+def redirect_location(response: aiohttp.ClientResponse) -> Optional[str]:
+    """The Location of a redirect response; None for any other response"""
+    if response.status in REDIRECT_STATUSES:
+        return response.headers.get('Location') or None
+    return None
@@ -0,0 +1,110 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Iterable, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the host's circuit is open"""
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff"""
+
+    def __init__(self, max_retries: int = 3, retry_delay: float = 5.0, max_delay: float = 60.0,
+                 retry_statuses: Iterable[int] = (429, 500, 502, 503, 504)):
+        """
+        Initialize the policy.
+        :param max_retries: Retries after the first attempt.
+        :param retry_delay: Base delay in seconds, doubled on every retry.
+        :param max_delay: Upper bound for a single delay in seconds.
+        :param retry_statuses: HTTP statuses that are worth retrying.
+        """
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def should_retry(self, attempt: int) -> bool:
+        """Check whether another attempt is allowed after `attempt` (0-based) failed"""
+        return attempt < self.max_retries
+
+    def get_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait before the next attempt.
+        A Retry-After header wins when present; otherwise the delay is drawn
+        uniformly from [0, retry_delay * 2^attempt] so retries from many
+        workers do not arrive in lockstep.
+        """
+        server_delay = self._parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.retry_delay * (2 ** attempt)))
+
+    def _parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After `failure_threshold` consecutive failures a host's circuit opens and
+    requests to it fail fast. Once `reset_timeout` seconds have passed a single
+    trial request is let through; its success closes the circuit, its failure
+    opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hosts: Dict[str, Dict[str, Any]] = {}
+
+    def allow_request(self, host: str) -> bool:
+        """Check whether a request to the host may be sent now"""
+        state = self.hosts.get(host)
+        if state is None or state['opened_at'] is None:
+            return True
+        if state['trial_in_flight']:
+            return False
+        if time.monotonic() - state['opened_at'] >= self.reset_timeout:
+            state['trial_in_flight'] = True
+            return True
+        return False
+
+    def record_success(self, host: str):
+        """Close the host's circuit"""
+        self.hosts.pop(host, None)
+
+    def record_failure(self, host: str):
+        """Count a failure, opening the circuit once the threshold is reached"""
+        state = self.hosts.setdefault(host, {'failures': 0, 'opened_at': None, 'trial_in_flight': False})
+        state['failures'] += 1
+        state['trial_in_flight'] = False
+        if state['failures'] >= self.failure_threshold:
+            state['opened_at'] = time.monotonic()
+
+    def release_trial(self, host: str):
+        """Let another trial request through after one ended without an outcome, e.g. when cancelled"""
+        state = self.hosts.get(host)
+        if state is not None:
+            state['trial_in_flight'] = False
+
+    def get_state(self, host: str) -> str:
+        """Get the host's circuit state: 'closed', 'open' or 'half-open'"""
+        state = self.hosts.get(host)
+        if state is None or state['opened_at'] is None:
+            return 'closed'
+        if state['trial_in_flight'] or time.monotonic() - state['opened_at'] >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
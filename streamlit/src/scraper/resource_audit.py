@@ -0,0 +1,104 @@
+import aiohttp
+from typing import Dict, Any, Optional
+from .probe import URLProbe
+from .redirects import HEAD_UNSUPPORTED_STATUSES
+
+# Resources larger than this are not downloaded just to be measured
+DEFAULT_MAX_DOWNLOAD_BYTES = 10 * 1024 * 1024
+
+
+class ResourceAuditor(URLProbe):
+    """
+    Page weight audit of stylesheets, scripts and preloaded resources.
+    Each unique resource URL is sized once per instance (see URLProbe), so the
+    bundles a site shares across thousands of pages are requested a single
+    time. Sizes come from the Content-Length of a HEAD request, which is the
+    compressed transfer size when the server compresses; only when that is
+    missing is the resource downloaded and counted.
+    """
+
+    def __init__(self, scraper, max_concurrency: int = 50, per_host_limit: int = 4,
+                 path: Optional[str] = None, max_download_bytes: int = DEFAULT_MAX_DOWNLOAD_BYTES):
+        """
+        Initialize the auditor.
+        :param max_download_bytes: Largest resource that is downloaded to be sized
+            when the server does not send Content-Length.
+        """
+        super().__init__(scraper, max_concurrency, per_host_limit, path)
+        self.max_download_bytes = max_download_bytes
+
+    async def audit_resources(self, session: aiohttp.ClientSession, resources: Dict[str, Any],
+                              image_bytes: int = 0) -> Dict[str, Any]:
+        """
+        Size the page's subresources concurrently and summarize its weight.
+        :param resources: The resolved 'resources' section of an analysis.
+        :param image_bytes: Image weight from the image audit, added to the total.
+        """
+        # A preloaded stylesheet or script is counted once, as what it is used for
+        entries: Dict[str, Dict[str, Any]] = {}
+        for kind, resource_type in (('stylesheets', 'stylesheet'), ('scripts', 'script')):
+            for resource in resources.get(kind, []):
+                entry = entries.setdefault(resource['url'], {'type': resource_type, 'render_blocking': False})
+                entry['render_blocking'] = entry['render_blocking'] or resource['render_blocking']
+        for resource in resources.get('preloads', []):
+            entries.setdefault(resource['url'], {'type': resource['as'] or 'other', 'render_blocking': False})
+
+        results = await self.probe_all(session, entries)
+        audited = [{**result, **entries[result['url']]} for result in results]
+
+        bytes_by_type: Dict[str, int] = {}
+        for result in audited:
+            if result.get('bytes') is not None:
+                bytes_by_type[result['type']] = bytes_by_type.get(result['type'], 0) + result['bytes']
+        resource_bytes = sum(bytes_by_type.values())
+        document_bytes = resources.get('document_bytes', 0)
+        render_blocking = [result['url'] for result in audited if result['render_blocking']]
+        return {
+            'total_bytes': document_bytes + resource_bytes + image_bytes,
+            'document_bytes': document_bytes,
+            'resource_bytes': resource_bytes,
+            'image_bytes': image_bytes,
+            'bytes_by_type': bytes_by_type,
+            'render_blocking': len(render_blocking),
+            'render_blocking_urls': render_blocking,
+            'unsized_resources': sum(1 for result in audited if result.get('bytes') is None),
+            'resources': audited
+        }
+
+    async def _probe(self, session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+        """Size from HEAD, falling back to GET when HEAD is rejected or has no Content-Length"""
+        async with await self.scraper.request(session, 'HEAD', url, allow_redirects=True) as response:
+            status = response.status
+            size = response.content_length
+            content_type = response.headers.get('content-type', '')
+        if status < 400 and size is not None:
+            return {'url': url, 'status': status, 'bytes': size, 'content_type': content_type}
+        if status >= 400 and status not in HEAD_UNSUPPORTED_STATUSES:
+            return {'url': url, 'status': status, 'bytes': None, 'content_type': content_type}
+
+        async with await self.scraper.request(session, 'GET', url, allow_redirects=True) as response:
+            result = {
+                'url': url,
+                'status': response.status,
+                'bytes': response.content_length,
+                'content_type': response.headers.get('content-type', '')
+            }
+            if response.status >= 400:
+                return {**result, 'bytes': None}
+            if result['bytes'] is None:
+                result['bytes'] = await self._count_body(response)
+        return result
+
+    async def _count_body(self, response: aiohttp.ClientResponse) -> Optional[int]:
+        """Count the (decoded) body bytes; None when the resource exceeds the download limit"""
+        total = 0
+        async for chunk in response.content.iter_any():
+            total += len(chunk)
+            if total > self.max_download_bytes:
+                response.close()
+                return None
+        return total
+
+    def _failure(self, url: str, error: str) -> Dict[str, Any]:
+        return {'url': url, 'status': None, 'bytes': None, 'error': error}
+
@@ -0,0 +1,169 @@
+import asyncio
+import zlib
+from urllib.parse import urljoin
+import aiohttp
+from lxml import etree
+from typing import Dict, Any, AsyncIterator, List
+from .resilience import CircuitOpenError
+from .web_scraper import READ_CHUNK_SIZE
+
+# Tried in order when robots.txt lists no sitemap
+DEFAULT_SITEMAP_PATHS = ('/sitemap.xml', '/sitemap_index.xml', '/sitemap.xml.gz')
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# The sitemaps.org limit for one uncompressed sitemap
+DEFAULT_MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+
+class SitemapReader:
+    """
+    Streaming sitemap reader.
+
+    Sitemaps are found through robots.txt (or the usual locations), read in
+    chunks, gunzipped on the fly and fed to an incremental lxml parser. Each
+    <url> element is cleared once its entry has been yielded, so memory stays
+    constant however large the sitemap is. Sitemap indexes are followed.
+    """
+
+    def __init__(self, scraper, max_sitemap_bytes: int = DEFAULT_MAX_SITEMAP_BYTES,
+                 max_index_depth: int = 2):
+        """
+        Initialize the reader.
+        :param scraper: SEOScraper whose session, robots.txt cache and retry policy are used.
+        :param max_sitemap_bytes: Largest uncompressed sitemap that will be read.
+        :param max_index_depth: How deep sitemap indexes may nest.
+        """
+        self.scraper = scraper
+        self.max_sitemap_bytes = max_sitemap_bytes
+        self.max_index_depth = max_index_depth
+        self.errors: List[Dict[str, str]] = []
+
+    async def discover_sitemaps(self, site_url: str, session: aiohttp.ClientSession) -> List[str]:
+        """Sitemap URLs listed in the site's robots.txt"""
+        try:
+            return await self.scraper.validator.get_sitemaps(site_url, session)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return []
+
+    async def iter_entries(self, site_url: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield {'loc', 'lastmod', 'sitemap'} for every page URL in the site's
+        sitemaps. Sitemaps that cannot be read are recorded in self.errors.
+        """
+        async with self.scraper.session_scope() as session:
+            sitemaps = await self.discover_sitemaps(site_url, session)
+            seen = set()
+            if sitemaps:
+                for sitemap_url in sitemaps:
+                    async for entry in self._read_sitemap(session, sitemap_url, 0, seen):
+                        yield entry
+                return
+
+            for path in DEFAULT_SITEMAP_PATHS:
+                sitemap_url = urljoin(site_url, path)
+                async for entry in self._read_sitemap(session, sitemap_url, 0, seen, missing_ok=True):
+                    yield entry
+                if sitemap_url in seen:
+                    return
+
+    async def iter_urls(self, site_url: str) -> AsyncIterator[str]:
+        """Yield only the page URLs of the site's sitemaps, e.g. as a crawl seed source"""
+        async for entry in self.iter_entries(site_url):
+            yield entry['loc']
+
+    async def _read_sitemap(self, session: aiohttp.ClientSession, sitemap_url: str, depth: int,
+                            seen: set, missing_ok: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Stream one sitemap; child sitemaps of an index are read after it"""
+        if sitemap_url in seen:
+            return
+
+        child_sitemaps: List[str] = []
+        try:
+            async with await self.scraper.request(session, 'GET', sitemap_url) as response:
+                if response.status != 200:
+                    if not (missing_ok and response.status == 404):
+                        self.errors.append({'url': sitemap_url, 'error': f"HTTP {response.status}"})
+                    return
+
+                seen.add(sitemap_url)
+                async for tag, loc, lastmod in self._parse(response):
+                    if tag == 'sitemap':
+                        child_sitemaps.append(loc)
+                    else:
+                        yield {'loc': loc, 'lastmod': lastmod, 'sitemap': sitemap_url}
+        except asyncio.TimeoutError:
+            self.errors.append({'url': sitemap_url, 'error': 'Request timed out'})
+            return
+        except (aiohttp.ClientError, CircuitOpenError, ValueError, etree.XMLSyntaxError, zlib.error) as e:
+            self.errors.append({'url': sitemap_url, 'error': str(e)})
+            return
+
+        if child_sitemaps and depth >= self.max_index_depth:
+            self.errors.append({'url': sitemap_url, 'error': 'Sitemap indexes nested too deeply'})
+            return
+        for child_url in child_sitemaps:
+            async for entry in self._read_sitemap(session, child_url, depth + 1, seen):
+                yield entry
+
+    async def _parse(self, response: aiohttp.ClientResponse) -> AsyncIterator[tuple]:
+        """Feed the body to a pull parser chunk by chunk, yielding (tag, loc, lastmod)"""
+        parser = etree.XMLPullParser(events=('end',), resolve_entities=False, no_network=True)
+        decompressor = None
+        total = 0
+        first_chunk = True
+
+        async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+            if first_chunk:
+                # .xml.gz files arrive still compressed; Content-Encoding gzip is already undone
+                if chunk.startswith(GZIP_MAGIC):
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                first_chunk = False
+
+            while chunk:
+                if decompressor is None:
+                    data, chunk = chunk, b''
+                else:
+                    # Bounded output per call, so a gzip bomb cannot expand in one step
+                    data = decompressor.decompress(chunk, READ_CHUNK_SIZE)
+                    chunk = decompressor.unconsumed_tail
+                total += len(data)
+                if total > self.max_sitemap_bytes:
+                    raise ValueError(f"Sitemap exceeds the {self.max_sitemap_bytes} byte limit")
+                parser.feed(data)
+                for entry in _read_events(parser):
+                    yield entry
+            # Buffered chunks are read without suspending; give other tasks a turn
+            await asyncio.sleep(0)
+
+        parser.close()
+        for entry in _read_events(parser):
+            yield entry
+
+
+def _read_events(parser: etree.XMLPullParser):
+    """Turn finished <url>/<sitemap> elements into entries and free them"""
+    for _, element in parser.read_events():
+        tag = etree.QName(element).localname
+        if tag not in ('url', 'sitemap'):
+            continue
+
+        loc = lastmod = None
+        for child in element:
+            if not isinstance(child.tag, str):
+                continue
+            name = etree.QName(child).localname
+            if name == 'loc':
+                loc = (child.text or '').strip()
+            elif name == 'lastmod':
+                lastmod = (child.text or '').strip() or None
+
+        # Drop the element and its already-processed siblings
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+        if loc:
+            yield tag, loc, lastmod
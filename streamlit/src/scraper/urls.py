@@ -0,0 +1,70 @@
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from typing import Optional
+
+WEB_SCHEMES = ('http', 'https')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+@lru_cache(maxsize=65536)
+def normalize_url(url: str) -> Optional[str]:
+    """
+    Normalize an absolute http(s) URL so equivalent spellings compare equal:
+    lowercase scheme and host, no default port, no fragment and '/' for an
+    empty path. Returns None for non-web or malformed URLs.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in WEB_SCHEMES or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    if ':' in host:
+        host = f"[{host}]"
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+
+def resolve_url(base_url: str, href: str) -> Optional[str]:
+    """Resolve an href against the page's base URL and normalize the result"""
+    href = href.strip()
+    if not href:
+        return None
+
+    # Fast path for plain root-relative links, by far the most common kind
+    if href.startswith('/') and not href.startswith('//') and '/.' not in href and '\\' not in href:
+        origin = url_origin(base_url)
+        return origin + href.split('#', 1)[0] if origin else None
+
+    try:
+        return normalize_url(urljoin(base_url, href))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def url_origin(url: str) -> Optional[str]:
+    """Normalized scheme://host[:port] of a URL"""
+    normalized = normalize_url(url)
+    if normalized is None:
+        return None
+    parts = urlsplit(normalized)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+@lru_cache(maxsize=65536)
+def site_host(url: str) -> str:
+    """Host (and non-default port) used to decide whether a URL is internal, without 'www.'"""
+    host = urlsplit(normalize_url(url) or '').netloc
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_internal(url: str, site_url: str) -> bool:
+    """Check whether a URL belongs to the same site as site_url"""
+    return site_host(url) == site_host(site_url)
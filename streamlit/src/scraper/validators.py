@@ -1,11 +1,28 @@
+import asyncio
+import time
 from urllib.parse import urlparse
+import aiohttp
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from urllib.robotparser import RobotFileParser
 
 class URLValidator:
-    def __init__(self):
-        self.robot_parser = RobotFileParser()
+    def __init__(self, user_agent: str = '*', robots_ttl: int = 3600, missing_robots_ttl: int = 3600,
+                 unavailable_robots_ttl: int = 300):
+        """
+        Initialize the validator.
+        :param user_agent: User agent matched against robots.txt groups.
+        :param robots_ttl: Seconds a fetched robots.txt stays cached per host.
+        :param missing_robots_ttl: Seconds a missing (4xx) robots.txt stays cached per host.
+        :param unavailable_robots_ttl: Seconds an unavailable robots.txt (5xx or
+            network failure) stays cached per host; the host is disallowed meanwhile.
+        """
+        self.user_agent = user_agent
+        self.robots_ttl = robots_ttl
+        self.missing_robots_ttl = missing_robots_ttl
+        self.unavailable_robots_ttl = unavailable_robots_ttl
+        self._robots_cache: Dict[str, Dict[str, Any]] = {}
+        self._robots_locks: Dict[str, asyncio.Lock] = {}
 
     def is_valid_url(self, url: str) -> bool:
         """Validate URL format and accessibility"""
@@ -15,34 +32,128 @@ class URLValidator:
         except Exception:
             return False
 
-    def check_robots_txt(self, url: str) -> Dict[str, Any]:
+    async def check_robots_txt(self, url: str, session: aiohttp.ClientSession) -> Dict[str, Any]:
         """Check robots.txt rules and availability"""
         try:
-            parsed_url = urlparse(url)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-            robots_url = f"{base_url}/robots.txt"
-            
-            self.robot_parser.set_url(robots_url)
-            self.robot_parser.read()
-            
-            can_crawl = self.robot_parser.can_fetch("*", url)
-            
-            return {
-                'has_robots_txt': True,
-                'can_crawl': can_crawl,
-                'robots_url': robots_url
+            rules = await self.get_robots_rules(url, session)
+            parser = rules['parser']
+
+            result = {
+                'has_robots_txt': rules['has_robots_txt'],
+                'can_crawl': parser.can_fetch(self.user_agent, url),
+                'robots_url': rules['robots_url'],
+                'crawl_delay': rules['crawl_delay']
             }
+            if 'error' in rules:
+                result['error'] = rules['error']
+            return result
         except Exception as e:
             return {
                 'has_robots_txt': False,
                 'can_crawl': True,  # Default to True if no robots.txt
+                'crawl_delay': None,
                 'error': str(e)
             }
 
+    async def get_crawl_delay(self, url: str, session: aiohttp.ClientSession) -> Optional[float]:
+        """Get the robots.txt Crawl-delay for the URL's host, if any"""
+        rules = await self.get_robots_rules(url, session)
+        return rules['crawl_delay']
+
+    async def get_sitemaps(self, url: str, session: aiohttp.ClientSession) -> List[str]:
+        """Get the sitemap URLs listed in robots.txt for the URL's host"""
+        rules = await self.get_robots_rules(url, session)
+        return rules['sitemaps']
+
+    async def get_robots_rules(self, url: str, session: aiohttp.ClientSession) -> Dict[str, Any]:
+        """
+        Get the parsed robots.txt rules for the URL's host.
+        Each host is fetched at most once per TTL; concurrent callers for the
+        same host wait on a single fetch.
+        """
+        parsed_url = urlparse(url)
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+        rules = self._cached_rules(base_url)
+        if rules:
+            return rules
+
+        lock = self._robots_locks.setdefault(base_url, asyncio.Lock())
+        async with lock:
+            rules = self._cached_rules(base_url)
+            if not rules:
+                rules = await self._fetch_robots_rules(base_url, session)
+                self._robots_cache[base_url] = rules
+            return rules
+
+    def clear_robots_cache(self):
+        """Forget all cached robots.txt rules"""
+        self._robots_cache.clear()
+
+    def _cached_rules(self, base_url: str) -> Optional[Dict[str, Any]]:
+        """Return cached rules for a host if they have not expired"""
+        rules = self._robots_cache.get(base_url)
+        if rules and time.monotonic() < rules['expires_at']:
+            return rules
+        return None
+
+    async def _fetch_robots_rules(self, base_url: str, session: aiohttp.ClientSession) -> Dict[str, Any]:
+        """
+        Fetch and parse robots.txt, following RobotFileParser.read() status
+        semantics: 401/403 disallow everything, other 4xx allow everything, and
+        an unavailable robots.txt (5xx or network failure) disallows everything
+        until it is retried after unavailable_robots_ttl.
+        """
+        robots_url = f"{base_url}/robots.txt"
+        parser = RobotFileParser(robots_url)
+        error = None
+
+        try:
+            async with session.get(robots_url) as response:
+                if response.status in (401, 403):
+                    parser.disallow_all = True
+                    has_robots_txt, ttl = False, self.robots_ttl
+                elif 400 <= response.status < 500:
+                    parser.allow_all = True
+                    has_robots_txt, ttl = False, self.missing_robots_ttl
+                elif response.status >= 500:
+                    parser.disallow_all = True
+                    has_robots_txt, ttl = False, self.unavailable_robots_ttl
+                    error = f"robots.txt unavailable: HTTP {response.status}"
+                else:
+                    body = await response.read()
+                    parser.parse(body.decode('utf-8', errors='ignore').splitlines())
+                    has_robots_txt, ttl = True, self.robots_ttl
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            parser.disallow_all = True
+            has_robots_txt, ttl = False, self.unavailable_robots_ttl
+            error = f"robots.txt unavailable: {e or type(e).__name__}"
+        parser.modified()
+
+        rules = {
+            'parser': parser,
+            'has_robots_txt': has_robots_txt,
+            'robots_url': robots_url,
+            'crawl_delay': parser.crawl_delay(self.user_agent),
+            'sitemaps': parser.site_maps() or [],
+            'expires_at': time.monotonic() + ttl
+        }
+        if error is not None:
+            rules['error'] = error
+        return rules
+
     def validate_response(self, response: requests.Response) -> Dict[str, Any]:
         """Validate HTTP response"""
+        content_type = response.headers.get('content-type', '')
         return {
             'status_code': response.status,
             'is_success': 200 <= response.status < 300,
-            'content_type': response.headers.get('content-type', ''),
-        }
\ No newline at end of file
+            'content_type': content_type,
+            'is_html': self.is_html_content_type(content_type),
+        }
+
+    def is_html_content_type(self, content_type: str) -> bool:
+        """Check whether a Content-Type header denotes an HTML document"""
+        mime_type = content_type.split(';', 1)[0].strip().lower()
+        # A missing Content-Type is sniffed as HTML, like browsers do
+        return mime_type in ('', 'text/html', 'application/xhtml+xml')
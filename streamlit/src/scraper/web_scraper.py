@@ -1,112 +1,438 @@
+import asyncio
+import copy
+import functools
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
 import aiohttp
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Optional, Union
 from .validators import URLValidator
+from .analyzer import analyze_document, resolve_urls, PARSER_BACKENDS
+from .cache import ValidatorStore, AnalysisMemo
+from .encoding import sniff_encoding
+from .resilience import RetryPolicy, CircuitBreaker, CircuitOpenError
+from .link_checker import LinkChecker
+from .image_audit import ImageAuditor
+from .resource_audit import ResourceAuditor
+from .redirects import RedirectResolver, redirect_location
+from .politeness import PolitenessScheduler
+from .archive import ResponseArchive
+
+READ_CHUNK_SIZE = 64 * 1024
+HEAD_END = b'</head>'
+
+# Mirrors Settings.SCRAPER_SETTINGS; pass that dict to override
+DEFAULT_SCRAPER_SETTINGS = {
+    'timeout': 30,
+    'connect_timeout': 10,
+    'read_timeout': 30,
+    'max_retries': 3,
+    'retry_delay': 5,
+    'max_retry_delay': 60,
+    'retry_statuses': [429, 500, 502, 503, 504],
+    'circuit_failure_threshold': 5,
+    'circuit_reset_timeout': 60
+}
 
 
 class SEOScraper:
-    def __init__(self):
+    def __init__(self, connection_limit: int = 100, limit_per_host: int = 8,
+                 dns_cache_ttl: int = 300, keepalive_timeout: float = 30.0,
+                 max_body_size: int = 10 * 1024 * 1024,
+                 parse_executor: Optional[str] = None, parse_workers: Optional[int] = None,
+                 parser_backend: str = 'html.parser',
+                 validator_store: Optional[ValidatorStore] = None,
+                 analysis_memo: Optional[AnalysisMemo] = None,
+                 scraper_settings: Optional[Dict[str, Any]] = None,
+                 image_cache_path: Optional[str] = None,
+                 resource_cache_path: Optional[str] = None,
+                 scheduler: Optional[PolitenessScheduler] = None,
+                 archive: Optional[ResponseArchive] = None):
+        """
+        Initialize the scraper.
+        :param connection_limit: Maximum number of open connections in the pool.
+        :param limit_per_host: Maximum number of concurrent connections per host.
+        :param dns_cache_ttl: Seconds to cache resolved DNS entries.
+        :param keepalive_timeout: Seconds to keep idle connections alive for reuse.
+        :param max_body_size: Largest response body, in bytes, that will be read.
+        :param parse_executor: Where HTML analysis runs: None (inline on the event
+            loop), 'thread' (thread pool) or 'process' (process pool).
+        :param parse_workers: Number of parse workers; defaults to the executor's own default.
+        :param parser_backend: HTML parser: 'html.parser', 'lxml' or 'lxml-tree'
+            (raw lxml tree, no BeautifulSoup layer).
+        :param validator_store: Store of ETag/Last-Modified validators; when given,
+            re-scrapes are conditional and a 304 returns the stored analysis.
+        :param analysis_memo: Memo of analyses by body hash; identical documents
+            are then analyzed once.
+        :param scraper_settings: Timeout, retry and circuit breaker settings
+            (Settings.SCRAPER_SETTINGS); missing keys use DEFAULT_SCRAPER_SETTINGS.
+        :param image_cache_path: JSON file that keeps image audit results across runs.
+        :param resource_cache_path: JSON file that keeps resource audit results across runs.
+        :param scheduler: Per-host politeness scheduler every request waits on
+            (rate limit, robots.txt Crawl-delay and adaptive concurrency).
+        :param archive: Archive every fetched page response is appended to,
+            for re-analysis without re-downloading (ResponseArchive.replay).
+        """
+        if parse_executor not in (None, 'thread', 'process'):
+            raise ValueError(f"Unknown parse executor: {parse_executor}")
+        if parser_backend not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend: {parser_backend}")
+
         self.validator = URLValidator()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (compatible; SEOAnalysisTool/1.0)'
         }
+        self.connection_limit = connection_limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.max_body_size = max_body_size
+        self.parse_executor = parse_executor
+        self.parse_workers = parse_workers
+        self.parser_backend = parser_backend
+        self.validator_store = validator_store
+        self.analysis_memo = analysis_memo
+        self.settings = {**DEFAULT_SCRAPER_SETTINGS, **(scraper_settings or {})}
+        self.timeout = aiohttp.ClientTimeout(
+            total=self.settings['timeout'],
+            sock_connect=self.settings['connect_timeout'],
+            sock_read=self.settings['read_timeout']
+        )
+        self.retry_policy = RetryPolicy(
+            max_retries=self.settings['max_retries'],
+            retry_delay=self.settings['retry_delay'],
+            max_delay=self.settings['max_retry_delay'],
+            retry_statuses=self.settings['retry_statuses']
+        )
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=self.settings['circuit_failure_threshold'],
+            reset_timeout=self.settings['circuit_reset_timeout']
+        )
+        self.scheduler = scheduler
+        self.archive = archive
+        self.redirect_resolver = RedirectResolver(self, per_host_limit=limit_per_host)
+        self.link_checker = LinkChecker(self, per_host_limit=limit_per_host)
+        self.image_auditor = ImageAuditor(self, per_host_limit=limit_per_host, path=image_cache_path)
+        self.resource_auditor = ResourceAuditor(self, per_host_limit=limit_per_host, path=resource_cache_path)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._executor: Optional[Executor] = None
+
+    async def __aenter__(self) -> 'SEOScraper':
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the shared session is open"""
+        return self._session is not None and not self._session.closed
+
+    async def open(self) -> aiohttp.ClientSession:
+        """Open the shared session used by every fetch until close() is called"""
+        if not self.is_open:
+            self._session = self._create_session()
+        return self._session
+
+    async def close(self):
+        """Close the shared session and parse workers, releasing pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.validator_store is not None:
+            self.validator_store.save()
+        self.image_auditor.save()
+        self.resource_auditor.save()
+        if self.archive is not None:
+            self.archive.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        """Create the parse executor on first use"""
+        if self.parse_executor is None:
+            return None
+        if self._executor is None:
+            if self.parse_executor == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.parse_workers, thread_name_prefix='seo-parse')
+        return self._executor
 
-    async def scrape_page(self, url: str) -> Dict[str, Any]:
-        """Main scraping function"""
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a session with a pooled, keep-alive connector"""
+        connector = aiohttp.TCPConnector(
+            limit=self.connection_limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        return aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=self.timeout)
+
+    @asynccontextmanager
+    async def session_scope(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """
+        Yield the shared session when the scraper is open, otherwise a
+        short-lived one that is closed on exit (single-page callers).
+        """
+        if self.is_open:
+            yield self._session
+        else:
+            async with self._create_session() as session:
+                yield session
+
+    async def scrape_page(self, url: str, head_only: bool = False, check_links: bool = False,
+                          audit_images: bool = False, audit_resources: bool = False) -> Dict[str, Any]:
+        """
+        Main scraping function
+        :param url: The URL to scrape. Redirects are followed through
+            redirect_resolver and the chain is reported under 'redirect'.
+        :param head_only: Stop downloading once </head> is received; only the
+            meta tags and other <head> elements are analyzed.
+        :param check_links: Check every resolved link on the page and report
+            the broken ones under links['broken_links'].
+        :param audit_images: Size every image on the page and report the
+            page's image weight under images['audit'].
+        :param audit_resources: Size every stylesheet, script and preloaded
+            resource and report the page's total weight and render-blocking
+            resources under resources['audit'].
+        """
         if not self.validator.is_valid_url(url):
             return {'error': 'Invalid URL format'}
 
-        robots_check = self.validator.check_robots_txt(url)
-        if not robots_check['can_crawl']:
-            return {'error': 'Crawling not allowed by robots.txt'}
-
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
-                async with session.get(url) as response:
-                    html = await response.text()
-                    validation = self.validator.validate_response(response)
+            async with self.session_scope() as session:
+                robots_check = await self.validator.check_robots_txt(url, session)
+                if not robots_check['can_crawl']:
+                    # An unavailable robots.txt is reported as such, not as a disallow
+                    return {'error': robots_check.get('error', 'Crawling not allowed by robots.txt')}
 
-                    if not validation['is_success']:
-                        return {'error': f"HTTP {validation['status_code']}"}
-
-                    return await self.analyze_content(html, url)
+                analysis = await self._fetch_and_analyze(session, url, head_only)
+                if check_links and 'error' not in analysis:
+                    links = analysis['links']
+                    link_urls = links['internal_urls'] + links['external_urls']
+                    links['broken_links'] = await self.link_checker.check_links(session, link_urls)
+                    links['checked_links'] = len(link_urls)
+                if audit_images and 'error' not in analysis:
+                    images = analysis['images']
+                    images['audit'] = await self.image_auditor.audit_images(session, images['image_urls'])
+                if audit_resources and 'error' not in analysis:
+                    image_bytes = analysis['images'].get('audit', {}).get('total_bytes', 0)
+                    analysis['resources']['audit'] = await self.resource_auditor.audit_resources(
+                        session, analysis['resources'], image_bytes
+                    )
+                return analysis
+        except asyncio.TimeoutError:
+            return {'error': 'Request timed out'}
         except Exception as e:
             return {'error': str(e)}
 
-    async def analyze_content(self, html: str, url: str) -> Dict[str, Any]:
-        """Analyze page content for SEO elements"""
-        soup = BeautifulSoup(html, 'html.parser')
-
-        return {
-            'meta_tags': self._analyze_meta_tags(soup),
-            'headings': self._analyze_headings(soup),
-            'images': self._analyze_images(soup),
-            'links': self._analyze_links(soup, url),
-            'content': self._analyze_content_quality(soup),
-            'technical': self._analyze_technical_elements(soup)
-        }
+    async def _fetch_and_analyze(self, session: aiohttp.ClientSession, url: str,
+                                 head_only: bool = False) -> Dict[str, Any]:
+        """Fetch a page, following its redirect chain, and analyze it"""
+        analysis = await self._fetch_document(session, url, head_only)
+        if analysis is not None:
+            return analysis
 
-    def _analyze_meta_tags(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        """Analyze meta tags"""
-        return {
-            'title': soup.title.string if soup.title else None,
-            'meta_description': soup.find('meta', {'name': 'description'}).get('content', None) if soup.find('meta', {'name': 'description'}) else None,
-            'meta_keywords': soup.find('meta', {'name': 'keywords'}).get('content', None) if soup.find('meta', {'name': 'keywords'}) else None,
-            'viewport': soup.find('meta', {'name': 'viewport'}).get('content', None) if soup.find('meta', {'name': 'viewport'}) else None,
-            'charset': soup.find('meta', {'charset': True}).get('charset', None) if soup.find('meta', {'charset': True}) else None
-        }
+        redirect = await self.redirect_resolver.probe_url(session, url)
+        while True:
+            if redirect.get('error'):
+                return {'error': redirect['error'], 'redirect': redirect}
+            if redirect['loop'] or redirect['too_long'] or redirect['final_url'] is None:
+                error = 'Redirect loop' if redirect['loop'] else 'Too many redirects' if redirect['too_long'] \
+                    else 'Redirect to a non-web URL'
+                return {'error': error, 'redirect': redirect}
 
-    def _analyze_headings(self, soup: BeautifulSoup) -> Dict[str, int]:
-        """Analyze heading structure"""
-        return {f'h{i}': len(soup.find_all(f'h{i}')) for i in range(1, 7)}
-
-    def _analyze_images(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        """Analyze image optimization"""
-        images = soup.find_all('img')
-        return {
-            'total_images': len(images),
-            'missing_alt': len([img for img in images if not img.get('alt')]),
-            'missing_src': len([img for img in images if not img.get('src')]),
-        }
+            final_url = redirect['final_url']
+            robots_check = await self.validator.check_robots_txt(final_url, session)
+            if not robots_check['can_crawl']:
+                error = robots_check.get('error', 'Crawling not allowed by robots.txt')
+                return {'error': error, 'redirect': redirect}
+            analysis = await self._fetch_document(session, final_url, head_only)
+            if analysis is not None:
+                analysis['redirect'] = redirect
+                return analysis
+            # The target redirected on GET; its hop was recorded, resolve on from there
+            tail = await self.redirect_resolver.probe_url(session, final_url)
+            redirect = self.redirect_resolver.extend(redirect, tail)
 
-    def _analyze_links(self, soup: BeautifulSoup, base_url: str) -> Dict[str, Any]:
-        """Analyze internal and external links"""
-        links = soup.find_all('a')
-        parsed_base = urlparse(base_url)
-
-        internal_links = []
-        external_links = []
-
-        for link in links:
-            href = link.get('href')
-            if href:
-                if href.startswith('/') or parsed_base.netloc in href:
-                    internal_links.append(href)
-                else:
-                    external_links.append(href)
-
-        return {
-            'internal_links': len(internal_links),
-            'external_links': len(external_links),
-            'total_links': len(links)
-        }
+    async def _fetch_document(self, session: aiohttp.ClientSession, url: str,
+                              head_only: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a page (conditionally, when validators are stored) and analyze it.
+        Returns None for a redirect, whose hop is handed to redirect_resolver.
+        """
+        stored = self.validator_store.get(url) if self.validator_store else None
+        request_headers = self.validator_store.conditional_headers(url) if stored else None
 
-    def _analyze_content_quality(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        """Basic content quality analysis"""
-        text = soup.get_text()
-        words = text.split()
+        async with await self.request(session, 'GET', url, headers=request_headers,
+                                      allow_redirects=False) as response:
+            location = redirect_location(response)
+            if location is not None:
+                self.redirect_resolver.record_hop(url, response.status, location)
+                return None
+            if response.status == 304 and stored:
+                return copy.deepcopy(stored['analysis'])
 
-        return {
-            'word_count': len(words),
-            'paragraphs': len(soup.find_all('p')),
-            'has_structured_data': bool(soup.find_all('script', {'type': 'application/ld+json'}))
-        }
+            validation = self.validator.validate_response(response)
+
+            if not validation['is_success']:
+                await self._archive_response(url, response, b'')
+                return {'error': f"HTTP {validation['status_code']}"}
+            if not validation['is_html']:
+                return {'error': f"Unsupported content type: {validation['content_type']}"}
+
+            body = await self._read_body(response, head_only)
+            if not head_only:
+                await self._archive_response(url, response, body)
+            encoding, body = sniff_encoding(body, validation['content_type'])
+            analysis = await self.analyze_content(body, url, encoding)
+
+            if self.validator_store is not None and not head_only:
+                self.validator_store.set(
+                    url,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    analysis
+                )
+            return analysis
+
+    async def _archive_response(self, url: str, response: aiohttp.ClientResponse, body: bytes):
+        """Append a response to the archive, if one is configured; compression and disk I/O run in a thread"""
+        if self.archive is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.archive.write, url, response.status, response.raw_headers,
+                                       body, response.reason or '', time.time())
+
+    async def request(self, session: aiohttp.ClientSession, method: str, url: str,
+                      **kwargs) -> aiohttp.ClientResponse:
+        """
+        Send a request through the host's circuit breaker, retrying connection
+        errors, timeouts and retryable statuses with jittered backoff. With a
+        scheduler, every attempt first waits for the host's turn.
+        The caller owns the returned response and must release it.
+        :raises CircuitOpenError: If the host's circuit is open.
+        """
+        host = urlparse(url).netloc
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow_request(host):
+                raise CircuitOpenError(f"Circuit open for {host} after repeated failures")
+
+            retry_after = None
+            try:
+                response = await self._send(session, method, url, host, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.circuit_breaker.record_failure(host)
+                if not self.retry_policy.should_retry(attempt):
+                    raise
+            except BaseException:
+                # Cancellation and programming errors say nothing about the host
+                self.circuit_breaker.release_trial(host)
+                raise
+            else:
+                if response.status not in self.retry_policy.retry_statuses:
+                    self.circuit_breaker.record_success(host)
+                    return response
+
+                self.circuit_breaker.record_failure(host)
+                if not self.retry_policy.should_retry(attempt):
+                    return response
+                retry_after = response.headers.get('Retry-After')
+                response.release()
+
+            await asyncio.sleep(self.retry_policy.get_delay(attempt, retry_after))
+            attempt += 1
+
+    async def _send(self, session: aiohttp.ClientSession, method: str, url: str, host: str,
+                    **kwargs) -> aiohttp.ClientResponse:
+        """
+        Send one request, waiting for the host's turn when a scheduler is set.
+        The host's slot stays taken until the response is released (its body
+        read to the end, or the response released or closed), so concurrency
+        limits bound the downloads and not only the waits for headers.
+        """
+        if self.scheduler is None:
+            return await session.request(method, url, **kwargs)
+
+        await self.scheduler.acquire(host, await self._crawl_delay(session, url))
+        started = time.monotonic()
+        try:
+            response = await session.request(method, url, **kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.scheduler.release(host, error=True)
+            raise
+        except BaseException:
+            # Cancelled: free the slot without a congestion signal
+            self.scheduler.release(host)
+            raise
+        release = functools.partial(self.scheduler.release, host, status=response.status,
+                                    latency=time.monotonic() - started)
+        connection = response.connection
+        if connection is None:
+            # Already released, e.g. a response without a body
+            release()
+        else:
+            connection.add_callback(release)
+        return response
+
+    async def _crawl_delay(self, session: aiohttp.ClientSession, url: str) -> Optional[float]:
+        """robots.txt Crawl-delay for the URL's host; None when robots.txt is unavailable"""
+        try:
+            return await self.validator.get_crawl_delay(url, session)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+
+    async def _read_body(self, response: aiohttp.ClientResponse, head_only: bool = False) -> bytes:
+        """
+        Stream the response body in chunks, enforcing max_body_size and
+        optionally stopping at the end of the document head.
+        """
+        if response.content_length and response.content_length > self.max_body_size:
+            raise ValueError(f"Response body of {response.content_length} bytes exceeds the {self.max_body_size} byte limit")
+
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+            search_from = max(0, len(body) - len(HEAD_END) + 1)
+            body.extend(chunk)
+            if len(body) > self.max_body_size:
+                raise ValueError(f"Response body exceeds the {self.max_body_size} byte limit")
+
+            if head_only:
+                head_end = body[search_from:].lower().find(HEAD_END)
+                if head_end != -1:
+                    return bytes(body[:search_from + head_end + len(HEAD_END)])
+        return bytes(body)
+
+    async def analyze_content(self, html: Union[str, bytes], url: str,
+                              encoding: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze page content for SEO elements.
+        With a parse executor configured, the raw document is shipped to a
+        worker and only the compact result dict comes back.
+        """
+        # The parse result does not depend on the URL (links are resolved
+        # afterwards), so duplicate documents at different URLs share an entry
+        memo_key = None
+        analysis = None
+        if self.analysis_memo is not None:
+            memo_key = self.analysis_memo.make_key(html, encoding)
+            analysis = self.analysis_memo.get(memo_key)
+
+        if analysis is None:
+            executor = self._get_executor()
+            if executor is None:
+                analysis = analyze_document(html, encoding, self.parser_backend)
+            else:
+                loop = asyncio.get_running_loop()
+                analysis = await loop.run_in_executor(
+                    executor, analyze_document, html, encoding, self.parser_backend
+                )
+            if memo_key is not None:
+                self.analysis_memo.set(memo_key, analysis)
 
-    def _analyze_technical_elements(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        """Analyze technical SEO elements"""
-        return {
-            'has_canonical': bool(soup.find('link', {'rel': 'canonical'})),
-            'has_favicon': bool(soup.find('link', {'rel': ['icon', 'shortcut icon']})),
-            'has_viewport': bool(soup.find('meta', {'name': 'viewport'}))
-        }
\ No newline at end of file
+        return resolve_urls(analysis, url)
@@ -0,0 +1,8 @@
+from .union_find import UnionFind
+from .duplicates import DuplicateDetector
+from .link_graph import LinkGraph
+from .canonicals import CanonicalResolver
+from .term_index import TermIndex
+from .anchor_index import AnchorIndex
+
+__all__ = ['UnionFind', 'DuplicateDetector', 'LinkGraph', 'CanonicalResolver', 'TermIndex', 'AnchorIndex']
@@ -0,0 +1,103 @@
+import heapq
+from typing import Dict, Any, List, Optional, Set
+from ..scraper.content import TERM_RE, STOPWORDS, MIN_TERM_LENGTH
+
+
+class AnchorIndex:
+    """
+    Inverted index of internal anchor text, for internal linking suggestions.
+
+    Crawl results are added once; afterwards every query is a handful of
+    dictionary lookups and set operations on integer page ids, so it answers
+    in milliseconds without rescanning the crawl. Anchor terms map to the
+    pages using them and the pages they link to; page terms (the indexed
+    content terms, content['term_counts']) map to the pages mentioning them,
+    which is what link opportunities are found from.
+    """
+
+    def __init__(self):
+        self.urls: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.titles: Dict[int, str] = {}
+        self.anchor_terms: Dict[str, Dict[int, Set[int]]] = {}
+        self.anchor_texts: Dict[int, Dict[str, Set[int]]] = {}
+        self.linked_from: Dict[int, Set[int]] = {}
+        self.mentions: Dict[str, Dict[int, int]] = {}
+
+    def add_page(self, url: str, analysis: Dict[str, Any]):
+        """Index a crawled page's internal anchors and content terms; pages with an error are skipped"""
+        if 'error' in analysis:
+            return
+        source = self._node(url)
+        title = analysis.get('meta_tags', {}).get('title')
+        if title:
+            self.titles[source] = title
+
+        links = analysis.get('links', {})
+        for target_url in links.get('internal_urls', []):
+            target = self._node(target_url)
+            if target != source:
+                self.linked_from.setdefault(target, set()).add(source)
+        for anchor in links.get('internal_anchors', []):
+            target = self._node(anchor['url'])
+            text = anchor['text'].casefold()
+            if target == source or not text:
+                continue
+            self.anchor_texts.setdefault(target, {}).setdefault(text, set()).add(source)
+            for term in set(anchor_terms(text)):
+                self.anchor_terms.setdefault(term, {}).setdefault(source, set()).add(target)
+
+        for term, count in analysis.get('content', {}).get('term_counts', {}).items():
+            self.mentions.setdefault(term, {})[source] = count
+
+    def anchors_to(self, url: str) -> List[Dict[str, Any]]:
+        """Anchor texts pointing to a page, most widely used first"""
+        target = self._ids.get(url)
+        texts = self.anchor_texts.get(target, {}) if target is not None else {}
+        anchors = [{'text': text, 'sources': len(sources)} for text, sources in texts.items()]
+        return sorted(anchors, key=lambda anchor: anchor['sources'], reverse=True)
+
+    def linked_with(self, term: str) -> Dict[str, List[str]]:
+        """Pages whose internal anchors contain the term, with the pages those anchors point to"""
+        sources = self.anchor_terms.get(term.casefold(), {})
+        return {self.urls[source]: [self.urls[target] for target in targets] for source, targets in sources.items()}
+
+    def link_opportunities(self, url: str, keyword: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Pages that mention a page's keyword but do not link to it, most mentions first.
+        :param keyword: Keyword to look for; defaults to the page's most common
+            anchor text, or its title when nothing links to it yet.
+        """
+        target = self._ids.get(url)
+        if target is None:
+            return []
+        if keyword is None:
+            anchors = self.anchors_to(url)
+            keyword = anchors[0]['text'] if anchors else self.titles.get(target, '')
+        terms = list(dict.fromkeys(anchor_terms(keyword.casefold())))
+        postings = [self.mentions.get(term, {}) for term in terms]
+        if not postings or not all(postings):
+            return []
+
+        # Intersect starting from the rarest term
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        candidates -= self.linked_from.get(target, set())
+        candidates.discard(target)
+        best = heapq.nlargest(limit, candidates, key=lambda page: sum(posting[page] for posting in postings))
+        return [
+            {'url': self.urls[page], 'keyword': keyword, 'mentions': sum(posting[page] for posting in postings)}
+            for page in best
+        ]
+
+    def _node(self, url: str) -> int:
+        node = self._ids.get(url)
+        if node is None:
+            node = self._ids[url] = len(self.urls)
+            self.urls.append(url)
+        return node
+
+
+def anchor_terms(text: str) -> List[str]:
+    """Content terms of a text, filtered like the content analytics' term counts"""
+    return [term for term in TERM_RE.findall(text.lower()) if len(term) >= MIN_TERM_LENGTH and term not in STOPWORDS]
@@ -0,0 +1,191 @@
+import re
+from typing import Dict, Any, List, Optional, Set
+from .union_find import UnionFind
+
+HTTP_ERROR_RE = re.compile(r'^HTTP (\d{3})$')
+
+
+class CanonicalResolver:
+    """
+    Canonical and hreflang consistency across a crawl.
+
+    Every page points to at most one canonical target, so the canonical links
+    form a functional graph: each page's final canonical, chains (a canonical
+    that canonicalizes elsewhere again) and loops are found in one memoized
+    walk that visits every page once. Pages are grouped into canonical
+    clusters, and hreflang alternates into language clusters, with union-find;
+    everything stays close to linear in the number of pages and links.
+    """
+
+    def __init__(self):
+        self.canonicals: Dict[str, str] = {}
+        self.hreflang: Dict[str, List[Dict[str, str]]] = {}
+        self.statuses: Dict[str, Optional[int]] = {}
+        self.errors: Dict[str, str] = {}
+        self.crawled: Set[str] = set()
+
+    def add_page(self, url: str, analysis: Dict[str, Any]):
+        """
+        Record a crawled page's status, canonical target and hreflang alternates.
+        A page reached through redirects is recorded with the status of each hop
+        (so a canonical pointing at a redirecting URL is reported), and its
+        content under the final URL.
+        """
+        redirect = analysis.get('redirect') or {}
+        chain = redirect.get('chain') or []
+        for hop in chain:
+            self.statuses[hop['url']] = hop['status']
+        if chain:
+            if redirect['loop'] or redirect['too_long'] or redirect['final_url'] is None:
+                self.errors[url] = analysis['error']
+                return
+            url = redirect['final_url']
+
+        if 'error' in analysis:
+            match = HTTP_ERROR_RE.match(analysis['error'])
+            self.statuses[url] = int(match.group(1)) if match else None
+            self.errors[url] = analysis['error']
+            return
+
+        self.statuses[url] = 200
+        self.crawled.add(url)
+        technical = analysis.get('technical', {})
+        if technical.get('canonical_url'):
+            self.canonicals[url] = technical['canonical_url']
+        if technical.get('hreflang'):
+            self.hreflang[url] = technical['hreflang']
+
+    def unchecked_targets(self) -> List[str]:
+        """Canonical and hreflang targets that were not crawled, so their status is unknown"""
+        targets = list(self.canonicals.values())
+        targets.extend(alternate['url'] for alternates in self.hreflang.values() for alternate in alternates)
+        return [target for target in dict.fromkeys(targets) if target not in self.statuses]
+
+    async def check_targets(self, scraper):
+        """
+        Request the uncrawled targets with the scraper's redirect resolver to learn
+        their status; a redirecting target gets the status of its first hop.
+        """
+        async with scraper.session_scope() as session:
+            for result in await scraper.redirect_resolver.probe_all(session, self.unchecked_targets()):
+                chain = result['chain']
+                self.statuses[result['url']] = chain[0]['status'] if chain else result['status']
+                if result.get('error'):
+                    self.errors[result['url']] = result['error']
+
+    def resolve(self) -> Dict[str, Any]:
+        """
+        Follow every canonical to its end.
+        :return: 'final' (url -> final canonical, None inside or leading into a loop),
+            'hops' (url -> number of canonical hops to the final one) and 'loops'.
+        """
+        final: Dict[str, Optional[str]] = {}
+        hops: Dict[str, Optional[int]] = {}
+        loops: List[List[str]] = []
+        on_path: Set[str] = set()
+
+        for start in self.canonicals:
+            path: List[str] = []
+            url: Optional[str] = start
+            while url is not None and url not in final and url not in on_path:
+                on_path.add(url)
+                path.append(url)
+                target = self.canonicals.get(url)
+                url = target if target != url else None
+
+            if url is None:
+                end, end_hops = path.pop(), 0
+                final[end], hops[end] = end, 0
+            elif url in on_path:
+                loop = path[path.index(url):]
+                loops.append(loop)
+                del path[-len(loop):]
+                for member in loop:
+                    final[member] = hops[member] = None
+                end, end_hops = None, None
+            else:
+                end, end_hops = final[url], hops[url]
+
+            for url in reversed(path):
+                end_hops = end_hops + 1 if end_hops is not None else None
+                final[url], hops[url] = end, end_hops
+            on_path.clear()
+
+        return {'final': final, 'hops': hops, 'loops': loops}
+
+    def canonical_clusters(self) -> List[Dict[str, Any]]:
+        """Pages that canonicalize to each other, with the cluster's final canonical"""
+        final = self.resolve()['final']
+        clusters = UnionFind()
+        for url, target in self.canonicals.items():
+            clusters.union(url, target)
+
+        groups = []
+        for urls in clusters.groups(min_size=2):
+            finals = {final.get(url, url) for url in urls if final.get(url, url) is not None}
+            canonical = finals.pop() if len(finals) == 1 else None
+            groups.append({'canonical': canonical, 'urls': urls})
+        return sorted(groups, key=lambda group: len(group['urls']), reverse=True)
+
+    def hreflang_clusters(self) -> List[List[str]]:
+        """Groups of pages connected by hreflang alternates"""
+        clusters = UnionFind()
+        for url, alternates in self.hreflang.items():
+            for alternate in alternates:
+                clusters.union(url, alternate['url'])
+        return sorted(clusters.groups(min_size=2), key=len, reverse=True)
+
+    def non_reciprocal_hreflang(self) -> List[Dict[str, str]]:
+        """Alternates of crawled pages that do not link back with an hreflang of their own"""
+        back_links = {url: {alternate['url'] for alternate in alternates} for url, alternates in self.hreflang.items()}
+        issues = []
+        for url, alternates in self.hreflang.items():
+            for alternate in alternates:
+                target = alternate['url']
+                if target == url or target not in self.crawled:
+                    continue
+                if url not in back_links.get(target, ()):
+                    issues.append({'url': url, 'alternate': target, 'hreflang': alternate['hreflang']})
+        return issues
+
+    def report(self) -> Dict[str, Any]:
+        """All canonical and hreflang findings"""
+        resolved = self.resolve()
+        chains = []
+        for url, target in self.canonicals.items():
+            if target != url and (resolved['hops'].get(url) or 0) > 1:
+                chain = [url]
+                while chain[-1] != resolved['final'][url]:
+                    chain.append(self.canonicals[chain[-1]])
+                chains.append({'url': url, 'chain': chain})
+
+        canonical_errors = [
+            self._target_issue(url, target, 'canonical_url')
+            for url, target in self.canonicals.items()
+            if target != url and target in self.statuses and not _is_success(self.statuses[target])
+        ]
+        hreflang_errors = [
+            {**self._target_issue(url, alternate['url'], 'alternate'), 'hreflang': alternate['hreflang']}
+            for url, alternates in self.hreflang.items() for alternate in alternates
+            if alternate['url'] in self.statuses and not _is_success(self.statuses[alternate['url']])
+        ]
+        return {
+            'canonical_clusters': self.canonical_clusters(),
+            'canonical_chains': chains,
+            'canonical_loops': resolved['loops'],
+            'canonical_errors': canonical_errors,
+            'hreflang_clusters': self.hreflang_clusters(),
+            'non_reciprocal_hreflang': self.non_reciprocal_hreflang(),
+            'hreflang_errors': hreflang_errors,
+            'unchecked_targets': len(self.unchecked_targets())
+        }
+
+    def _target_issue(self, url: str, target: str, field: str) -> Dict[str, Any]:
+        issue = {'url': url, field: target, 'status': self.statuses[target]}
+        if target in self.errors:
+            issue['error'] = self.errors[target]
+        return issue
+
+
+def _is_success(status: Optional[int]) -> bool:
+    return status is not None and 200 <= status < 300
@@ -0,0 +1,127 @@
+import re
+import numpy as np
+from typing import Dict, Any, List, Optional
+from .union_find import UnionFind
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+class DuplicateDetector:
+    """
+    Duplicate titles, meta descriptions and near-duplicate bodies across a crawl.
+
+    Pages are added one at a time as crawl results arrive. Titles and
+    descriptions go into exact-match indexes keyed by their normalized text.
+    Bodies are compared through the MinHash signature of their visible
+    vocabulary (content['minhash']) with locality-sensitive hashing: the
+    signature is cut into bands and only pages that agree on a whole band are
+    compared, against one representative per cluster already in the band's
+    bucket, so the work stays close to linear in the number of pages even
+    when templated pages crowd the same buckets.
+    """
+
+    def __init__(self, threshold: float = 0.8, bands: int = 8, min_words: int = 50):
+        """
+        Initialize the detector.
+        :param threshold: Estimated Jaccard similarity from which pages are near duplicates.
+        :param bands: LSH bands the signature is cut into; with 64 positions, 8 bands
+            of 8 make pages above ~0.77 similarity candidates.
+        :param min_words: Pages with fewer visible words are left out of body comparison.
+        """
+        self.threshold = threshold
+        self.bands = bands
+        self.min_words = min_words
+        self.titles: Dict[str, List[str]] = {}
+        self.descriptions: Dict[str, List[str]] = {}
+        self._display: Dict[str, str] = {}
+        # Identical signatures are grouped first, so band buckets hold distinct signatures only
+        self._pages_by_signature: Dict[bytes, List[str]] = {}
+        self._buckets: List[Dict[bytes, List[bytes]]] = [{} for _ in range(bands)]
+
+    def add_page(self, url: str, analysis: Dict[str, Any]):
+        """Index one crawled page; pages with an error are ignored"""
+        if 'error' in analysis:
+            return
+
+        meta_tags = analysis.get('meta_tags', {})
+        self._index_text(self.titles, meta_tags.get('title'), url)
+        self._index_text(self.descriptions, meta_tags.get('meta_description'), url)
+
+        content = analysis.get('content', {})
+        if not content.get('minhash') or content.get('word_count', 0) < self.min_words:
+            return
+        signature = bytes.fromhex(content['minhash'])
+        pages = self._pages_by_signature.setdefault(signature, [])
+        pages.append(url)
+        if len(pages) == 1:
+            width = len(signature) // self.bands
+            for band, buckets in enumerate(self._buckets):
+                buckets.setdefault(signature[band * width:(band + 1) * width], []).append(signature)
+
+    def duplicate_titles(self) -> List[Dict[str, Any]]:
+        """Titles shared by more than one page"""
+        return self._exact_clusters(self.titles, 'title')
+
+    def duplicate_descriptions(self) -> List[Dict[str, Any]]:
+        """Meta descriptions shared by more than one page"""
+        return self._exact_clusters(self.descriptions, 'meta_description')
+
+    def near_duplicates(self) -> List[List[str]]:
+        """Clusters of pages whose bodies are identical or nearly so, largest first"""
+        clusters = UnionFind()
+        for signature in self._pages_by_signature:
+            clusters.add(signature)
+
+        # Within a bucket each signature is compared with one representative per
+        # cluster seen there, so templated pages that share a bucket and a
+        # cluster cost one comparison each instead of one per pair
+        for buckets in self._buckets:
+            for signatures in buckets.values():
+                if len(signatures) < 2:
+                    continue
+                representatives: List[bytes] = []
+                for signature in signatures:
+                    root = clusters.find(signature)
+                    for representative in representatives:
+                        if clusters.find(representative) == root:
+                            break
+                        if similarity(signature, representative) >= self.threshold:
+                            clusters.union(representative, signature)
+                            break
+                    else:
+                        representatives.append(signature)
+
+        groups = []
+        for signatures in clusters.groups():
+            urls = [url for signature in signatures for url in self._pages_by_signature[signature]]
+            if len(urls) > 1:
+                groups.append(urls)
+        return sorted(groups, key=len, reverse=True)
+
+    def report(self) -> Dict[str, Any]:
+        """All duplicate findings"""
+        near_duplicates = self.near_duplicates()
+        return {
+            'duplicate_titles': self.duplicate_titles(),
+            'duplicate_descriptions': self.duplicate_descriptions(),
+            'near_duplicate_clusters': near_duplicates,
+            'near_duplicate_pages': sum(len(cluster) for cluster in near_duplicates)
+        }
+
+    def _index_text(self, index: Dict[str, List[str]], text: Optional[str], url: str):
+        if not text:
+            return
+        key = WHITESPACE_RE.sub(' ', text).strip().casefold()
+        if key:
+            index.setdefault(key, []).append(url)
+            self._display.setdefault(key, text.strip())
+
+    def _exact_clusters(self, index: Dict[str, List[str]], field: str) -> List[Dict[str, Any]]:
+        clusters = [{field: self._display[key], 'urls': urls} for key, urls in index.items() if len(urls) > 1]
+        return sorted(clusters, key=lambda cluster: len(cluster['urls']), reverse=True)
+
+
+def similarity(first: bytes, second: bytes) -> float:
+    """Estimated Jaccard similarity: the share of equal MinHash positions"""
+    equal = np.frombuffer(first, dtype='<u4') == np.frombuffer(second, dtype='<u4')
+    return float(equal.mean())
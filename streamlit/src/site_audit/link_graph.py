@@ -0,0 +1,150 @@
+from array import array
+import numpy as np
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from ..scraper.urls import normalize_url
+
+
+class LinkGraph:
+    """
+    Internal link graph of a crawl, for PageRank, click depth and orphan pages.
+
+    URLs are mapped to consecutive integer ids and edges are appended to
+    compact integer arrays as crawl results arrive. build() turns them into
+    CSR form (indptr/indices, duplicate links collapsed), on which PageRank
+    and click depth run as vectorized NumPy passes over the edge arrays, so
+    graphs of a few million links fit comfortably in memory.
+    """
+
+    def __init__(self):
+        self.urls: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._crawled = array('b')
+        self._sources = array('i')
+        self._targets = array('i')
+        self._csr: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def add_page(self, url: str, analysis: Dict[str, Any]):
+        """Add a crawled page and its internal links; pages with an error have no outgoing links"""
+        source = self._node(url)
+        self._crawled[source] = 1
+        if 'error' in analysis:
+            return
+        for target_url in analysis.get('links', {}).get('internal_urls', []):
+            target = self._node(target_url)
+            if target != source:
+                self._sources.append(source)
+                self._targets.append(target)
+        self._csr = None
+
+    def build(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        CSR arrays of the graph: the links of node i are indices[indptr[i]:indptr[i + 1]].
+        A page linking to the same target several times counts as one link.
+        """
+        if self._csr is None:
+            count = len(self.urls)
+            sources = np.frombuffer(self._sources, dtype=np.int32).astype(np.int64)
+            targets = np.frombuffer(self._targets, dtype=np.int32).astype(np.int64)
+            edges = np.sort(sources * count + targets)
+            edges = edges[np.concatenate(([True], edges[1:] != edges[:-1]))] if edges.size else edges
+            indices = (edges % count).astype(np.int32)
+            indptr = np.zeros(count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(edges // count, minlength=count), out=indptr[1:])
+            self._csr = (indptr, indices)
+        return self._csr
+
+    def pagerank(self, damping: float = 0.85, tolerance: float = 1e-9, max_iterations: int = 100) -> np.ndarray:
+        """
+        PageRank by power iteration, indexed like self.urls and summing to 1.
+        Pages without outgoing links (including linked but uncrawled pages)
+        spread their rank evenly over all pages.
+        """
+        count = len(self.urls)
+        if count == 0:
+            return np.zeros(0)
+        indptr, indices = self.build()
+        out_degree = np.diff(indptr)
+        edge_sources = np.repeat(np.arange(count), out_degree)
+        dangling = out_degree == 0
+        inverse_degree = np.divide(1.0, out_degree, out=np.zeros(count), where=~dangling)
+
+        rank = np.full(count, 1.0 / count)
+        for _ in range(max_iterations):
+            shares = (rank * inverse_degree)[edge_sources]
+            new_rank = damping * np.bincount(indices, weights=shares, minlength=count)
+            new_rank += (1.0 - damping + damping * rank[dangling].sum()) / count
+            converged = np.abs(new_rank - rank).sum() < tolerance
+            rank = new_rank
+            if converged:
+                break
+        return rank
+
+    def click_depth(self, start_url: str) -> np.ndarray:
+        """
+        Fewest clicks from the start page to every page, indexed like
+        self.urls; -1 for pages that cannot be reached. Breadth-first search,
+        expanding a whole level at a time.
+        """
+        depth = np.full(len(self.urls), -1, dtype=np.int32)
+        start = self._ids.get(normalize_url(start_url) or start_url)
+        if start is None:
+            return depth
+        indptr, indices = self.build()
+
+        depth[start] = 0
+        frontier = np.array([start])
+        level = 0
+        while frontier.size:
+            level += 1
+            starts, ends = indptr[frontier], indptr[frontier + 1]
+            lengths = ends - starts
+            # Positions of all links of the frontier, without a Python loop over its pages
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            neighbours = indices[offsets]
+            neighbours = neighbours[depth[neighbours] == -1]
+            depth[neighbours] = level
+            frontier = np.flatnonzero(depth == level) if neighbours.size else neighbours
+        return depth
+
+    def orphans(self, sitemap_urls: Iterable[str]) -> List[str]:
+        """Sitemap URLs that no crawled page links to"""
+        _, indices = self.build()
+        linked = np.zeros(len(self.urls), dtype=bool)
+        linked[indices] = True
+        linked_urls = {self.urls[node] for node in np.flatnonzero(linked)}
+        sitemap = dict.fromkeys(normalize_url(url) or url for url in sitemap_urls)
+        return [url for url in sitemap if url not in linked_urls]
+
+    def report(self, start_url: str, sitemap_urls: Optional[Iterable[str]] = None,
+               top: int = 20) -> Dict[str, Any]:
+        """PageRank leaders, click depth distribution, unreachable pages and orphans"""
+        _, indices = self.build()
+        rank = self.pagerank()
+        depth = self.click_depth(start_url)
+        crawled = np.frombuffer(self._crawled, dtype=np.int8).astype(bool)
+        reachable = depth >= 0
+        levels, counts = np.unique(depth[reachable], return_counts=True)
+        return {
+            'pages': int(crawled.sum()),
+            'urls': len(self.urls),
+            'links': int(indices.size),
+            'top_pagerank': [
+                {'url': self.urls[node], 'pagerank': float(rank[node])}
+                for node in np.argsort(-rank, kind='stable')[:top]
+            ],
+            'click_depth': {int(level): int(count) for level, count in zip(levels, counts)},
+            'max_click_depth': int(depth.max()) if reachable.any() else None,
+            'unreachable_pages': [self.urls[node] for node in np.flatnonzero(crawled & ~reachable)],
+            'orphan_pages': self.orphans(sitemap_urls) if sitemap_urls is not None else []
+        }
+
+    def _node(self, url: str) -> int:
+        node = self._ids.get(url)
+        if node is None:
+            node = self._ids[url] = len(self.urls)
+            self.urls.append(url)
+            self._crawled.append(0)
+        return node
@@ -0,0 +1,177 @@
+from array import array
+import zlib
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+
+DEFAULT_FEATURES = 2 ** 20
+
+# Upper bound on the pair products generated per chunk of the similarity join
+PAIR_CHUNK = 5_000_000
+
+
+class TermIndex:
+    """
+    Site-wide TF-IDF term index and keyword cannibalization detection.
+
+    Pages are added incrementally from their content['term_counts']. Terms are
+    hashed into a fixed number of columns (no vocabulary has to be built or
+    shared), and the raw counts are appended to CSR arrays. TF-IDF weights
+    depend on the whole site, so the weighted matrix is derived on demand.
+    Cannibalization compares pages on their top terms only: the sparse
+    product of that matrix with its transpose is computed column by column
+    in NumPy, so only pages sharing a top term are ever paired.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_FEATURES):
+        """
+        Initialize the index.
+        :param n_features: Number of hashed term columns.
+        """
+        self.n_features = n_features
+        self.urls: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self.terms: Dict[int, str] = {}
+        self.document_frequency = np.zeros(n_features, dtype=np.int32)
+        self._indptr = array('q', [0])
+        self._indices = array('i')
+        self._counts = array('f')
+        self._tfidf: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def add_page(self, url: str, analysis: Dict[str, Any]):
+        """Index a crawled page's visible terms; pages with an error, no terms or already indexed are skipped"""
+        term_counts = analysis.get('content', {}).get('term_counts') if 'error' not in analysis else None
+        if not term_counts or url in self._rows:
+            return
+
+        columns: Dict[int, float] = {}
+        for term, count in term_counts.items():
+            column = zlib.crc32(term.encode('utf-8')) % self.n_features
+            self.terms.setdefault(column, term)
+            columns[column] = columns.get(column, 0) + count
+
+        self._rows[url] = len(self.urls)
+        self.urls.append(url)
+        self._indices.extend(columns.keys())
+        self._counts.extend(columns.values())
+        self._indptr.append(len(self._indices))
+        self.document_frequency[list(columns)] += 1
+        self._tfidf = None
+
+    def tfidf(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        TF-IDF matrix in CSR form (indptr, indices, data), one L2-normalized
+        row per page: sublinear term frequency times smoothed inverse document frequency.
+        """
+        if self._tfidf is None:
+            indptr = np.frombuffer(self._indptr, dtype=np.int64).copy()
+            indices = np.frombuffer(self._indices, dtype=np.int32).copy()
+            counts = np.frombuffer(self._counts, dtype=np.float32)
+            idf = np.log((1 + len(self.urls)) / (1 + self.document_frequency[indices])) + 1
+            data = (1 + np.log(counts)) * idf
+            self._tfidf = (indptr, indices, _normalize_rows(indptr, data))
+        return self._tfidf
+
+    def top_terms(self, url: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Highest-weighted terms of a page"""
+        indptr, indices, data = self.tfidf()
+        row = self._rows[url]
+        start, end = indptr[row], indptr[row + 1]
+        order = np.argsort(-data[start:end], kind='stable')[:limit]
+        return [{'term': self.terms[int(indices[start + i])], 'weight': float(data[start + i])} for i in order]
+
+    def cannibalization(self, threshold: float = 0.5, top_terms: int = 20,
+                        max_pages_per_term: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Page pairs whose top terms have a cosine similarity of at least threshold.
+        :param top_terms: Highest-weighted terms per page that take part in the comparison.
+        :param max_pages_per_term: Terms among the top terms of more pages than this
+            (site-wide boilerplate) are left out of the join; they still count in
+            the vector norms, so similarities are only slightly underestimated.
+        """
+        rows, columns, weights = self._top_term_entries(top_terms)
+        if not rows.size:
+            return []
+
+        # Entries grouped by term; each group pairs up all pages sharing that term
+        order = np.lexsort((rows, columns))
+        rows, columns, weights = rows[order], columns[order], weights[order]
+        starts = np.flatnonzero(np.concatenate(([True], columns[1:] != columns[:-1])))
+        lengths = np.diff(np.append(starts, columns.size))
+        keep = np.repeat(lengths <= max_pages_per_term, lengths)
+        partners = np.repeat(starts + lengths, lengths) - np.arange(columns.size) - 1
+        partners[~keep] = 0
+
+        page_count = len(self.urls)
+        pair_keys: List[np.ndarray] = []
+        pair_sums: List[np.ndarray] = []
+        boundaries = np.searchsorted(np.cumsum(partners), np.arange(PAIR_CHUNK, partners.sum(), PAIR_CHUNK))
+        for chunk in np.split(np.arange(columns.size), boundaries):
+            counts = partners[chunk]
+            first = np.repeat(chunk, counts)
+            # Each entry pairs with the entries after it in its group
+            second = first + 1 + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            keys, sums = _sum_by_key(rows[first].astype(np.int64) * page_count + rows[second],
+                                     weights[first] * weights[second])
+            pair_keys.append(keys)
+            pair_sums.append(sums)
+
+        keys, similarities = _sum_by_key(np.concatenate(pair_keys), np.concatenate(pair_sums))
+        matches = similarities >= threshold
+        pairs = []
+        for key, similarity in zip(keys[matches], similarities[matches]):
+            first, second = divmod(int(key), page_count)
+            pairs.append({
+                'urls': [self.urls[first], self.urls[second]],
+                'similarity': round(float(similarity), 4),
+                'shared_terms': self._shared_terms(first, second, top_terms)
+            })
+        return sorted(pairs, key=lambda pair: pair['similarity'], reverse=True)
+
+    def report(self, threshold: float = 0.5, top_terms: int = 20) -> Dict[str, Any]:
+        """Cannibalizing page pairs and how many pages are involved"""
+        pairs = self.cannibalization(threshold, top_terms)
+        return {
+            'pages': len(self.urls),
+            'cannibalization_pairs': pairs,
+            'cannibalizing_pages': len({url for pair in pairs for url in pair['urls']})
+        }
+
+    def _top_term_entries(self, top_terms: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(row, column, weight) of each page's top terms, weights renormalized per page"""
+        indptr, indices, data = self.tfidf()
+        rows = np.repeat(np.arange(len(self.urls)), np.diff(indptr))
+        # Rank entries within their row by descending weight
+        order = np.lexsort((-data, rows))
+        rank = np.arange(data.size) - np.repeat(indptr[:-1], np.diff(indptr))
+        selected = np.sort(order[rank < top_terms])
+        rows, columns, weights = rows[selected], indices[selected], data[selected]
+        top_indptr = np.zeros(len(self.urls) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self.urls)), out=top_indptr[1:])
+        return rows, columns, _normalize_rows(top_indptr, weights)
+
+    def _shared_terms(self, first: int, second: int, top_terms: int) -> List[str]:
+        first_terms = [entry['term'] for entry in self.top_terms(self.urls[first], top_terms)]
+        second_terms = {entry['term'] for entry in self.top_terms(self.urls[second], top_terms)}
+        return [term for term in first_terms if term in second_terms]
+
+
+def _normalize_rows(indptr: np.ndarray, data: np.ndarray) -> np.ndarray:
+    """Scale each CSR row to unit length"""
+    lengths = np.diff(indptr)
+    norms = np.sqrt(np.add.reduceat(data * data, indptr[:-1][lengths > 0])) if data.size else np.zeros(0)
+    row_norms = np.ones(lengths.size)
+    row_norms[lengths > 0] = norms
+    return data / np.repeat(row_norms, lengths)
+
+
+def _sum_by_key(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum values with equal keys; returns the sorted distinct keys and their sums"""
+    if not keys.size:
+        return keys, values
+    order = np.argsort(keys, kind='stable')
+    keys, values = keys[order], values[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return keys[starts], np.add.reduceat(values, starts)
@@ -0,0 +1,42 @@
+from typing import Dict, Hashable, List
+
+
+class UnionFind:
+    """Disjoint sets with path halving and union by size; near-constant time per operation"""
+
+    def __init__(self):
+        self.parent: Dict[Hashable, Hashable] = {}
+        self.size: Dict[Hashable, int] = {}
+
+    def add(self, item: Hashable):
+        """Add an item as its own set, if it is not known yet"""
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item: Hashable) -> Hashable:
+        """Get the representative of the item's set"""
+        self.add(item)
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: Hashable, b: Hashable) -> Hashable:
+        """Merge the sets of a and b and return the new representative"""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+    def groups(self, min_size: int = 1) -> List[List[Hashable]]:
+        """All sets with at least min_size members, members in insertion order"""
+        members: Dict[Hashable, List[Hashable]] = {}
+        for item in self.parent:
+            members.setdefault(self.find(item), []).append(item)
+        return [group for group in members.values() if len(group) >= min_size]
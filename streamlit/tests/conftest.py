@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scraper is imported as the src package of the streamlit/ directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
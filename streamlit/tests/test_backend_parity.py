@@ -0,0 +1,20 @@
+import pytest
+from src.scraper.analyzer import analyze_document, PARSER_BACKENDS
+from src.scraper.benchmark import PARITY_SAMPLES, build_page, check_backend_parity
+
+DOCUMENTS = PARITY_SAMPLES + [build_page(100)]
+
+
+@pytest.mark.parametrize('backend', PARSER_BACKENDS[1:])
+@pytest.mark.parametrize('index', range(len(DOCUMENTS)))
+def test_backend_matches_reference(index, backend):
+    body = DOCUMENTS[index].encode('utf-8')
+    expected = analyze_document(body, 'utf-8', PARSER_BACKENDS[0])
+    result = analyze_document(body, 'utf-8', backend)
+    assert result.keys() == expected.keys()
+    for section, values in expected.items():
+        assert result[section] == values, section
+
+
+def test_check_backend_parity_reports_no_mismatches():
+    assert check_backend_parity() == []
@@ -0,0 +1,48 @@
+import pytest
+from src.scraper.content import minhash
+from src.site_audit import duplicates
+from src.site_audit.duplicates import DuplicateDetector
+from src.site_audit.union_find import UnionFind
+
+TEMPLATE = [f'template{i}' for i in range(200)]
+
+
+def templated_page(number):
+    """A page of the shared template plus a few words of its own"""
+    terms = TEMPLATE + [f'product{number}word{i}' for i in range(10)]
+    return {'content': {'minhash': minhash(terms), 'word_count': len(terms)}}
+
+
+@pytest.mark.parametrize('pages', [500, 2000])
+def test_templated_pages_cluster_with_linear_work(pages, monkeypatch):
+    operations = []
+    similarity = duplicates.similarity
+
+    def counting_similarity(first, second):
+        operations.append('similarity')
+        return similarity(first, second)
+
+    class CountingUnionFind(UnionFind):
+        def find(self, item):
+            operations.append('find')
+            return super().find(item)
+
+    monkeypatch.setattr(duplicates, 'similarity', counting_similarity)
+    monkeypatch.setattr(duplicates, 'UnionFind', CountingUnionFind)
+
+    detector = DuplicateDetector()
+    for number in range(pages):
+        detector.add_page(f'https://example.com/p/{number}', templated_page(number))
+    clusters = detector.near_duplicates()
+
+    assert [len(cluster) for cluster in clusters] == [pages]
+    # A bounded number of comparisons and lookups per page and band, never one per pair
+    assert len(operations) <= 10 * pages * detector.bands
+
+
+def test_distinct_pages_are_not_clustered():
+    detector = DuplicateDetector()
+    for number in range(50):
+        terms = [f'page{number}word{i}' for i in range(100)]
+        detector.add_page(f'https://example.com/{number}', {'content': {'minhash': minhash(terms), 'word_count': 100}})
+    assert detector.near_duplicates() == []
@@ -0,0 +1,23 @@
+import pytest
+from src.scraper.analyzer import analyze_document, PARSER_BACKENDS
+from src.scraper.encoding import sniff_encoding
+
+DOCUMENT = '<html><head><title>Café</title></head><body><p>Crème brûlée is a dessert.</p></body></html>'
+
+
+@pytest.mark.parametrize('backend', PARSER_BACKENDS)
+@pytest.mark.parametrize('charset, codec', [
+    ('latin-1', 'latin-1'),
+    ('utf_8', 'utf-8'),
+    ('EUC_JP', 'euc_jp'),
+    ('cp437', 'cp437'),
+])
+def test_declared_charset_aliases_decode_on_every_backend(charset, codec, backend):
+    encoding, body = sniff_encoding(DOCUMENT.encode(codec), f'text/html; charset={charset}')
+    analysis = analyze_document(body, encoding, backend)
+    assert analysis['meta_tags']['title'] == 'Café'
+    assert analysis['content']['word_count'] == 5
+
+
+def test_non_text_codecs_are_ignored():
+    assert sniff_encoding(b'<p>x</p>', 'text/html; charset=base64')[0] == 'utf-8'